@@ -1,25 +1,65 @@
-from flask import Flask, render_template, request, redirect, url_for, jsonify, send_from_directory
+from flask import Flask, render_template, request, redirect, url_for, jsonify, send_from_directory, abort, make_response, g, before_render_template, template_rendered
 import os
-import json
-import requests
-from PIL import Image
-import io
+import argparse
+import hashlib
 import re
-import random
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+import threading
+import time
+from collections import namedtuple
+from data_store import DataStore
+from version_poller import VersionPoller
+from image_fetcher import ImageFetcher
+from image_pipeline import ImagePipeline
+from sprites import build_sprite, load_sprite
+from item_index import ItemIndex
+from item_graph import ItemGraph
+from champion_stats import ChampionStats, STAT_NAMES, MAX_LEVEL
+from page_cache import PageCache
+from quiz_engine import QuizEngine
+from league_core import DataDragon, FALLBACK_VERSION
+from descriptions import clean_text, champion_descriptions, item_descriptions
+from catalog import Catalog, CatalogError, champion_records, item_records, encode_variants
+from search_index import SearchIndex, champion_entries, item_entries
+from metrics import REGISTRY, REQUEST_SECONDS, REQUESTS, TEMPLATE_SECONDS, IMAGE_CACHE, current_endpoint
+import logs
+
+
+data_store = DataStore()
+log = logs.get_logger("app")
+
+PatchSnapshot = namedtuple("PatchSnapshot", ["version", "version_dir"])
 
 
 class LeagueViewer:
-    def __init__(self):
+    def __init__(self, ddragon_url="https://ddragon.leagueoflegends.com", poll_interval=3600, page_cache_bytes=32 * 1024 * 1024, async_fetch=False, offline=False, image_sizes=(32, 64, 128), image_formats=("png", "webp")):
         self.app = Flask(__name__)
+        self.ddragon_url = ddragon_url
         self.cache_dir = "cache"
-        self.image_cache_dir = os.path.join(self.cache_dir, "images")
-        self.language = "pl_PL"
-        self.latest_version = self.get_latest_version()
-        self.version_dir = os.path.join(self.cache_dir, self.latest_version)
-        self.full_dir = os.path.join(self.version_dir, self.language)
-        self.sorted_unique_items = {"en_US": None, 'pl_PL': None}
-        self.heores = {"en_US": None, 'pl_PL': None}
-        os.makedirs(self.full_dir, exist_ok=True)
+        self.default_language = "pl_PL"
+        self.image_pipeline = ImagePipeline(sizes=image_sizes, formats=image_formats)
+        if async_fetch:
+            # httpx is only needed for the async serving mode (asgi.py).
+            from async_fetcher import AsyncImageFetcher
+            self.image_fetcher = AsyncImageFetcher(pipeline=self.image_pipeline)
+        else:
+            self.image_fetcher = ImageFetcher(pipeline=self.image_pipeline)
+        # Cache layout, dataset loading and version lookup are shared with the desktop viewers.
+        # In async mode datasets and versions.json go through the fetcher's httpx client too.
+        self.ddragon = DataDragon(self.cache_dir, ddragon_url, fetcher=self.image_fetcher, http=self.image_fetcher if async_fetch else None)
+        self.image_store = self.ddragon.image_store
+        self.patch = self.initial_patch(offline)
+        self.swap_lock = threading.Lock()
+        self.prefetched = set()
+        self.sprites = {}
+        self.refetching = set()
+        self.poller = VersionPoller(self, interval=poll_interval)
+        self.ready = threading.Event()
+        self.page_cache = PageCache(page_cache_bytes)
+        self.quiz = QuizEngine()
+        self.build_id = self.compute_build_id()
+        self.app.extensions['league_viewer'] = self
+        os.makedirs(self.language_dir(self.default_language), exist_ok=True)
 
         self.setup_routes()
         self.translations = {
@@ -38,6 +78,8 @@ class LeagueViewer:
                 'skills': "Skills",
                 'description': "Description",
                 'builds_into': "Builds Into",
+                'builds_from': "Builds From",
+                'recipe': "Recipe",
                 'cost': "Cost",
                 'correct': "Correct",
                 'wrong': "Wrong",
@@ -59,6 +101,8 @@ class LeagueViewer:
                 'skills': "Umiejętności",
                 'description': "Opis",
                 'builds_into': "Buduje się w",
+                'builds_from': "Składa się z",
+                'recipe': "Drzewko budowy",
                 'cost': 'Koszt',
                 'correct': "Dobrze",
                 'wrong': "Źle",
@@ -69,221 +113,772 @@ class LeagueViewer:
         self.spell_keybind_map = {0: 'Q', 1: 'W', 2: 'E', 3: 'R'}
 
     def setup_routes(self):
+        @self.app.before_request
+        def start_timer():
+            g.request_started = time.perf_counter()
+
+        @self.app.after_request
+        def record_request(response):
+            # Labelled by endpoint, not path, so /champion/<id> is one series; unmatched URLs share one.
+            endpoint = request.endpoint or "unmatched"
+            REQUEST_SECONDS.observe(time.perf_counter() - g.request_started, endpoint, request.method)
+            REQUESTS.inc(endpoint, str(response.status_code))
+            return response
+
+        def start_render(sender, template, context, **extra):
+            g.render_started = time.perf_counter()
+
+        def record_render(sender, template, context, **extra):
+            TEMPLATE_SECONDS.observe(time.perf_counter() - g.render_started, current_endpoint(), template.name)
+
+        before_render_template.connect(start_render, self.app, weak=False)
+        template_rendered.connect(record_render, self.app, weak=False)
+
+        @self.app.route('/metrics')
+        def metrics():
+            response = make_response(REGISTRY.render(self.cache_metrics))
+            response.content_type = "text/plain; version=0.0.4; charset=utf-8"
+            return response
+
         @self.app.route('/')
         def index():
-            return render_template('index.html', language=self.language, translations=self.translations[self.language])
+            language = self.resolve_language()
+            return render_template('index.html', language=language, translations=self.translations[language])
 
         @self.app.route('/set_language', methods=['POST'])
         def set_language():
-            self.language = request.form.get('language')
-            self.full_dir = os.path.join(self.version_dir, self.language)
-            print(self.language)
-            return redirect(request.referrer)
+            referrer = urlsplit(request.referrer or url_for('index'))
+            query = urlencode([(key, value) for key, value in parse_qsl(referrer.query) if key != 'lang'])
+            response = redirect(urlunsplit(referrer._replace(query=query)))
+            language = request.form.get('language')
+            if language in self.translations:
+                response.set_cookie('language', language, max_age=365 * 24 * 3600, samesite='Lax')
+            return response
+
+        @self.app.route('/ready')
+        def ready():
+            if not self.ready.is_set():
+                return jsonify({"ready": False, "version": self.latest_version}), 503
+            return jsonify({"ready": True, "version": self.latest_version})
+
+        @self.app.route('/cache/stats')
+        def cache_stats():
+            return jsonify({"datasets": data_store.stats(), "pages": self.page_cache.stats(), "quiz": self.quiz.stats()})
+
+        @self.app.route('/api/search')
+        def search():
+            language = self.resolve_language()
+            kind = request.args.get('type', 'champion')
+            if kind not in ('champion', 'item'):
+                return jsonify({"error": "type must be champion or item"}), 400
+            limit = min(max(request.args.get('limit', 10, type=int), 1), 50)
+            results = self.get_search_index(kind, language).search(request.args.get('q', ''), limit)
+            endpoint = 'champion_details' if kind == 'champion' else 'item_details'
+            return jsonify([{
+                "id": entry_id,
+                "name": name,
+                "url": url_for(endpoint, **{f"{kind}_id": entry_id}),
+                "image": url_for('serve_image', language=language, image_name=f"{entry_id}.png"),
+            } for entry_id, name in results])
+
+        @self.app.route('/api/champions')
+        def api_champions():
+            return self.api_page('champions')
+
+        @self.app.route('/api/items')
+        def api_items():
+            return self.api_page('items')
+
+        @self.app.route('/api/items/<item_id>/tree')
+        def api_item_tree(item_id):
+            tree = self.get_item_graph(self.resolve_language()).tree_json(item_id)
+            if tree is None:
+                return jsonify({"error": "item not found"}), 404
+            return self.app.response_class(tree, mimetype='application/json')
+
+        @self.app.route('/api/items/buildable')
+        def api_buildable():
+            """?from=1036,1036,1037 lists items whose recipe uses any component (&all=1: every one), cheapest first."""
+            item_graph = self.get_item_graph(self.resolve_language())
+            components = [item_id for item_id in request.args.get('from', '').split(',') if item_id]
+            map_id = request.args.get('map')
+            within = item_graph.maps.get(map_id, 0) if map_id else None
+            return jsonify(item_graph.buildable(components, request.args.get('all') == '1', within))
+
+        @self.app.route('/api/stats/top')
+        def api_stats_top():
+            """?stat=armor&level=11&k=10[&order=asc] ranks every champion by one stat at one level."""
+            stat = request.args.get('stat', 'hp')
+            level = request.args.get('level', 1, type=int)
+            if stat not in STAT_NAMES or not 1 <= level <= MAX_LEVEL:
+                return jsonify({"error": f"stat must be one of {', '.join(STAT_NAMES)} and level 1-{MAX_LEVEL}"}), 400
+            k = min(max(request.args.get('k', 10, type=int), 1), 200)
+            ranking = self.get_champion_stats(self.resolve_language()).top(stat, level, k, request.args.get('order') == 'asc')
+            return jsonify({"stat": stat, "level": level, "champions": [{"id": champion_id, "name": name, "value": value} for champion_id, name, value in ranking]})
+
+        @self.app.route('/api/stats/compare')
+        def api_stats_compare():
+            """?champions=Ahri,Annie[&stats=hp,armor] returns each champion's stats at levels 1-18 side by side."""
+            champion_stats = self.get_champion_stats(self.resolve_language())
+            champion_ids = [champion_id for champion_id in request.args.get('champions', '').split(',') if champion_id][:10]
+            stats = [stat for stat in request.args.get('stats', '').split(',') if stat] or list(STAT_NAMES)
+            unknown = [value for value in stats if value not in STAT_NAMES] + [value for value in champion_ids if value not in champion_stats.by_id]
+            if unknown or not champion_ids:
+                return jsonify({"error": f"unknown or missing champions/stats: {', '.join(unknown)}"}), 400
+            return jsonify({
+                "levels": list(range(1, MAX_LEVEL + 1)),
+                "champions": [{"id": champion_id, "name": champion_stats.names[champion_stats.by_id[champion_id]], "stats": champion_stats.levels(champion_id, stats)} for champion_id in champion_ids],
+            })
 
         @self.app.route('/champions')
         def champions():
-            champions_data = self.get_data("championFull")
-            if not self.heores[self.language]:
-                for champion_id, champion in champions_data.items():
-                    image_url = f"https://ddragon.leagueoflegends.com/cdn/{self.latest_version}/img/champion/{champion_id}.png"
-                    self.fetch_image(image_url, f"{champion_id}.png")
-                self.heores[self.language] = champions_data
-            return render_template('champions.html', language=self.language, champions=champions_data, translations=self.translations[self.language])
+            language = self.resolve_language()
+            etag = self.page_etag(language)
+            if request.if_none_match.contains(etag):
+                return self.cacheable('', etag, 304)
+            champions_data = self.get_champions(language)
+            sprite = self.get_sprite("champions", [f"{champion_id}.png" for champion_id in champions_data], language)
+            return self.cacheable(render_template('champions.html', language=language, champions=champions_data, sprite=sprite, translations=self.translations[language]), etag)
 
         @self.app.route('/items')
         def items():
-            self.update_items()
-            return render_template('items.html', items=self.sorted_unique_items[self.language], language=self.language, fetch_image=self.fetch_image, translations=self.translations[self.language])
+            language = self.resolve_language()
+            etag = self.page_etag(language)
+            if request.if_none_match.contains(etag):
+                return self.cacheable('', etag, 304)
+            item_index = self.get_item_index(language)
+            sprite = self.get_sprite("items", [f"{item['id']}.png" for _, item in item_index.shop_items], language)
+            return self.cacheable(render_template('items.html', items=item_index.shop_items, language=language, sprite=sprite, translations=self.translations[language]), etag)
 
         @self.app.route('/champion/<champion_id>')
         def champion_details(champion_id):
-            champions_data = self.get_data("championFull")
-            champion = champions_data.get(champion_id, None)
-            if not champion:
+            language = self.resolve_language()
+            etag = self.page_etag(language)
+            if request.if_none_match.contains(etag):
+                return self.cacheable('', etag, 304)
+            html = self.render_champion_page(champion_id, language)
+            if html is None:
                 return "Champion not found", 404
-            for spell in champion['spells']:
-                spell['description'] = self.strip_html_tags(spell['description'])
-            return render_template('champion_details.html', champion=champion, language=self.language, translations=self.translations[self.language], fetch_image=self.fetch_image)
+            return self.cacheable(html, etag)
 
         @self.app.route('/item/<item_id>')
         def item_details(item_id):
-            item_data = self.get_data("item")
-            item = item_data.get(item_id, None)
-            if not item:
-                return "Champion not found", 404
-            item['description'] = self.strip_html_tags(item['description'])
-            return render_template('item_details.html', item_data=item_data, language=self.language, item=item, item_id=item_id, translations=self.translations[self.language], fetch_image=self.fetch_image)
+            language = self.resolve_language()
+            etag = self.page_etag(language)
+            if request.if_none_match.contains(etag):
+                return self.cacheable('', etag, 304)
+            html = self.render_item_page(item_id, language)
+            if html is None:
+                return "Item not found", 404
+            return self.cacheable(html, etag)
 
         @self.app.route('/quiz/items', methods=['GET'])
         def item_quiz():
-            self.update_items()
-            correct_item_name, correct_item = random.choice(self.sorted_unique_items[self.language])
-            correct_item_id = correct_item['id']
-            image_url = f"https://ddragon.leagueoflegends.com/cdn/{self.latest_version}/img/item/{correct_item_id}.png"
-            self.fetch_image(image_url, f"{correct_item_id}.png")
-            incorrect_items = random.sample(
-                [item for name, item in self.sorted_unique_items[self.language] if name != correct_item_name], 3)
-            incorrect_answers = [self.strip_html_tags(item['name']) for item in incorrect_items]
-            options = incorrect_answers + [correct_item_name]
-            random.shuffle(options)
-            total_items = len(self.sorted_unique_items[self.language])
+            language = self.resolve_language()
+            started = self.start_quiz("items", language)
+            if started is None:
+                return "No quiz questions are available right now, try again shortly", 503
+            session_id, session, question = started
             return render_template(
                 'quiz_items.html', 
-                image=f"{correct_item_id}.png", 
-                options=options, 
-                correct_answer=correct_item_name, 
-                total_items=total_items,
-                language=self.language, 
-                translations=self.translations[self.language]
+                session=session_id,
+                question=question,
+                total_items=len(session.deck),
+                language=language, 
+                translations=self.translations[language]
             )
-        
-        @self.app.route('/quiz/items/next', methods=['GET'])
-        def next_quiz_item():
-            correct_item_name, correct_item = random.choice(self.sorted_unique_items[self.language])
-            correct_item_id = correct_item['id']
-            image_url = f"https://ddragon.leagueoflegends.com/cdn/{self.latest_version}/img/item/{correct_item_id}.png"
-            self.fetch_image(image_url, f"{correct_item_id}.png")
-            incorrect_items = random.sample(
-                [item for name, item in self.sorted_unique_items[self.language] if name != correct_item_name], 3)
-            incorrect_answers = [self.strip_html_tags(item['name']) for item in incorrect_items]
-            options = incorrect_answers + [correct_item_name]
-            random.shuffle(options)
-            return jsonify({
-            "image": f"{correct_item_id}.png",
-            "options": options,
-            "correct_answer": correct_item_name
-        })
 
-        @self.app.route('/images/<path:image_name>')
-        def serve_image(image_name):
-            return send_from_directory(self.full_dir, image_name)
+        @self.app.route('/quiz/<kind>/batch', methods=['GET'])
+        def quiz_batch(kind):
+            """Next n questions of a quiz session (a new one without ?session=), images already fetched."""
+            if kind not in ("items", "champions"):
+                abort(404)
+            language = self.resolve_language()
+            session_id = request.args.get('session') or self.quiz.start(self.latest_version, language)
+            n = min(max(request.args.get('n', 10, type=int), 1), 50)
+            batch = self.deal_quiz(kind, session_id, n, request.args.get('offset', type=int))
+            if batch is None:
+                return jsonify({"error": "Quiz session expired, start a new quiz"}), 410
+            session, questions = batch
+            return jsonify({
+                "session": session_id,
+                "total": len(session.deck),
+                "offset": questions[-1]["position"] + 1 if questions else len(session.deck),
+                "questions": questions
+            })
+        
+        @self.app.url_defaults
+        def add_image_version(endpoint, values):
+            if endpoint == 'serve_image':
+                values.setdefault('version', self.latest_version)
+
+        @self.app.route('/images/<version>/<language>/<path:image_name>')
+        def serve_image(version, language, image_name):
+            if language not in self.translations or not self.servable_version(version):
+                abort(404)
+            # Image URLs carry the patch version, so their content never changes.
+            response = self.icon_response(version, language, image_name)
+            IMAGE_CACHE.inc(current_endpoint(), "hit" if response is not None else "miss")
+            if response is not None and image_name.startswith("sprites/"):
+                # A sprite is rebuilt in place once an icon that failed to download arrives, so
+                # browsers revalidate it (send_from_directory sets an ETag) instead of keeping it.
+                response.cache_control.max_age = 300
+            elif response is not None:
+                response.cache_control.immutable = True
+            else:
+                # Patches cached before variants existed, or with other sizes/formats configured,
+                # only have the base icon; the placeholder covers icons that may still arrive.
+                # Neither is final, so both are cached briefly.
+                base_name = self.image_pipeline.base_name(image_name)
+                if base_name and base_name != image_name:
+                    response = self.icon_response(version, language, base_name)
+                if response is None:
+                    response = send_from_directory(os.path.join(self.app.static_folder, 'img'), 'placeholder.png')
+                response.cache_control.max_age = 60
+            response.cache_control.public = True
+            return response
 
         @self.app.route('/quiz/champions', methods=['GET'])
         def champion_quiz():
-            champions_data = self.get_data("championFull")
-            correct_champion_id = random.choice(list(champions_data.keys()))
-            correct_champion = champions_data[correct_champion_id]
-            correct_spell = random.choice(correct_champion['spells'])
-            spell_keyboardbind = self.spell_keybind_map.get(correct_champion['spells'].index(correct_spell))
-            correct_spell_name = correct_spell['name']
-            ability_image_url = f"https://ddragon.leagueoflegends.com/cdn/{self.latest_version}/img/spell/{correct_spell['id']}.png"
-            champion_image_url = f"https://ddragon.leagueoflegends.com/cdn/{self.latest_version}/img/champion/{correct_champion_id}.png"
-            self.fetch_image(ability_image_url, f"{correct_spell['id']}.png")
-            self.fetch_image(champion_image_url, f"{correct_champion_id}.png")
-
-            incorrect_spells = [s for s in correct_champion['spells'] if s['name'] != correct_spell_name]
-            incorrect_spells_sample = random.sample(incorrect_spells, min(3, len(incorrect_spells)))
-
-            incorrect_spell_names = [s['name'] for s in incorrect_spells_sample]
-
-            options = incorrect_spell_names + [correct_spell_name]
-            random.shuffle(options)
-
-            total_champions = len(champions_data)
-
+            language = self.resolve_language()
+            started = self.start_quiz("champions", language)
+            if started is None:
+                return "No quiz questions are available right now, try again shortly", 503
+            session_id, session, question = started
             return render_template(
                 'quiz_champions.html',
-                champion_image=f"{correct_champion_id}.png",
-                ability_image=f"{correct_spell['id']}.png",
-                options=options,
-                correct_answer=correct_spell_name,
-                total_champions=total_champions,
-                language=self.language,
-                spell_keybind=spell_keyboardbind.upper(),
-                translations=self.translations[self.language]
+                session=session_id,
+                question=question,
+                total_champions=len(session.deck),
+                language=language,
+                translations=self.translations[language]
             )
 
 
-        @self.app.route('/quiz/champions/next', methods=['GET'])
-        def next_quiz_champion():
-            champions_data = self.get_data("championFull")
-            correct_champion_id = random.choice(list(champions_data.keys()))
-            correct_champion = champions_data[correct_champion_id]
-            correct_spell = random.choice(correct_champion['spells'])
-            correct_spell_name = correct_spell['name']
-            spell_keyboardbind = self.spell_keybind_map.get(correct_champion['spells'].index(correct_spell))
-            ability_image_url = f"https://ddragon.leagueoflegends.com/cdn/{self.latest_version}/img/spell/{correct_spell['id']}.png"
-            champion_image_url = f"https://ddragon.leagueoflegends.com/cdn/{self.latest_version}/img/champion/{correct_champion_id}.png"
-            self.fetch_image(champion_image_url, f"{correct_champion_id}.png")
-            self.fetch_image(ability_image_url, f"{correct_spell['id']}.png")
-            incorrect_spells = [s for s in correct_champion['spells'] if s['name'] != correct_spell_name]
-            incorrect_spell_names = [s['name'] for s in random.sample(incorrect_spells, min(3, len(incorrect_spells)))]
-            options = incorrect_spell_names + [correct_spell_name]
-            random.shuffle(options)
-
-            total_champions = len(champions_data)
 
-            return jsonify({
-                "champion_image": f"{correct_champion_id}.png",
-                "ability_image": f"{correct_spell['id']}.png",
-                "spell_keybind": spell_keyboardbind.upper(),
-                "options": options,
-                "correct_answer": correct_spell_name,
-                "total_champions": total_champions
-            })
+    @property
+    def latest_version(self):
+        return self.patch.version
+
+    @property
+    def version_dir(self):
+        return self.patch.version_dir
 
+    def language_dir(self, language, version=None):
+        return os.path.join(self.cache_dir, version, language) if version else os.path.join(self.patch.version_dir, language)
 
-    def get_latest_version(self):
-        try:
-            url = "https://ddragon.leagueoflegends.com/api/versions.json"
-            return requests.get(url).json()[0]
-        except:
-            return "12.6.1"
-    
-
-    def update_items(self):
-        items_data = self.get_data("item")
-        if not self.sorted_unique_items[self.language]:
-            unique_items = {}
-            for item_id, item in items_data.items():
-                if item['maps'].get('11', False) and item["name"] not in unique_items:
-                    unique_items[item["name"]] = item
-                    unique_items[item["name"]]["id"] = item_id
-                    unique_items[item["name"]]["name"] = self.strip_html_tags(item['name'])
-                    image_url = f"https://ddragon.leagueoflegends.com/cdn/{self.latest_version}/img/item/{item_id}.png"
-                    self.fetch_image(image_url, f"{item_id}.png")
-            
-            self.sorted_unique_items[self.language] = sorted(unique_items.items(), key=lambda x: x[1]['gold']['total'])
-
-    def get_data(self, data_type):
-        version = self.get_latest_version()
-        data_path = os.path.join(self.version_dir, self.language, f"{data_type}.json")
-        if os.path.exists(data_path):
-            with open(data_path, 'r') as file:
-                return json.load(file)
-
-        url = f"https://ddragon.leagueoflegends.com/cdn/{version}/data/{self.language}/{data_type}.json"
-        response = requests.get(url).json()['data']
-
-        os.makedirs(os.path.dirname(data_path), exist_ok=True)
-        with open(data_path, 'w') as file:
-            json.dump(response, file)
+    def compute_build_id(self):
+        """Fingerprint of the code and templates, so page ETags change on deploy as well as on a new patch."""
+        root = os.path.dirname(os.path.abspath(__file__))
+        paths = [os.path.join(root, 'app.py')]
+        for directory, _, names in os.walk(os.path.join(root, 'templates')):
+            paths.extend(os.path.join(directory, name) for name in names)
+        return str(max(os.stat(path).st_mtime_ns for path in paths))
 
+    def page_etag(self, language):
+        key = f"{self.latest_version}|{language}|{request.path}|{self.build_id}"
+        return hashlib.sha1(key.encode()).hexdigest()
+
+    def cacheable(self, body, etag, status=200):
+        """Attach a version-scoped ETag so browsers revalidate and get a 304 until the patch changes."""
+        response = make_response(body, status)
+        response.set_etag(etag)
+        response.cache_control.no_cache = True
+        response.vary.update(('Cookie', 'Accept-Language'))
         return response
 
-    def strip_html_tags(self, text):
-        text = text.replace('<br>', '\n').replace('<br />', '\n').replace('<br/>', '\n')
-        clean = re.compile('<.*?>')
-        return re.sub(clean, '', text)
+    def resolve_language(self):
+        """Pick the request's language from ?lang=, the language cookie or Accept-Language."""
+        language = request.args.get('lang') or request.cookies.get('language')
+        if language in self.translations:
+            return language
+        for value, _ in request.accept_languages:
+            code = value.replace('-', '_').lower()
+            for supported in self.translations:
+                if code in (supported.lower(), supported.split('_')[0].lower()):
+                    return supported
+        return self.default_language
+
+    def initial_patch(self, offline=False):
+        cached_versions = self.ddragon.cached_versions()
+        if cached_versions:
+            version = cached_versions[-1]
+        elif offline:
+            version = FALLBACK_VERSION
+        else:
+            version = self.get_latest_version()
+        return PatchSnapshot(version, os.path.join(self.cache_dir, version))
+
+    def servable_version(self, version):
+        """The live patch or one fully cached on disk; anything else in an image URL is a 404."""
+        if version == self.latest_version:
+            return True
+        return re.fullmatch(r'[0-9][0-9a-z._]*', version) is not None and os.path.exists(os.path.join(self.cache_dir, version, ".complete"))
+
+    def version_key(self, version):
+        return self.ddragon.version_key(version)
+
+    def get_latest_version(self, fallback=FALLBACK_VERSION):
+        return self.ddragon.latest_version(fallback)
+
+    def image_url(self, kind, name, version=None):
+        return self.ddragon.image_url(version or self.latest_version, kind, name)
+
+    def patch_images(self, version, language):
+        """List (url, name) pairs for every champion, spell and map 11 item icon of a patch."""
+        champions_data = self.get_data("championFull", language, version)
+        items_data = self.get_data("item", language, version)
+        images = []
+        for champion_id, champion in champions_data.items():
+            images.append((self.image_url('champion', champion_id, version), f"{champion_id}.png"))
+            for spell in champion['spells']:
+                images.append((self.image_url('spell', spell['id'], version), f"{spell['id']}.png"))
+        for item_id, item in items_data.items():
+            if item['maps'].get('11', False):
+                images.append((self.image_url('item', item_id, version), f"{item_id}.png"))
+        return images
+
+    def warm(self, version, language):
+        """Populate cache/<version>/<language>/ with icons and grid sprites and return {image name: status}."""
+        statuses = self.prefetch_images(version, language, self.patch_images(version, language))
+        self.build_indexes(version, language)
+        return statuses
+
+    def build_indexes(self, version, language):
+        """Build the grid sprites, description tables and item index of an already downloaded patch."""
+        image_dir = self.language_dir(language, version)
+        champions_data = self.get_data("championFull", language, version)
+        items_data = self.get_data("item", language, version)
+        read_icon = lambda name: self.read_icon(version, language, name)
+        build_sprite(read_icon, [f"{champion_id}.png" for champion_id in champions_data], os.path.join(image_dir, "sprites", "champions.png"))
+        build_sprite(read_icon, [f"{item_id}.png" for item_id, item in items_data.items() if item['maps'].get('11', False)], os.path.join(image_dir, "sprites", "items.png"))
+        self.get_descriptions("championFull", language, version)
+        self.get_descriptions("item", language, version)
+        data_store.get(version, language, "item_index", lambda: ItemIndex(items_data, clean_text))
+        self.get_search_index("champion", language, version)
+        self.get_search_index("item", language, version)
+        self.get_item_graph(language, version)
+        self.get_champion_stats(language, version)
+
+    def build_offline(self, version, image_dirs, languages):
+        """Pack icons from image_dirs and build every index of a patch without touching the network."""
+        self.image_store.build(version, list(image_dirs) + [self.language_dir(language, version) for language in sorted(languages)], self.version_key)
+        for language in languages:
+            self.build_indexes(version, language)
+        open(os.path.join(self.cache_dir, version, ".complete"), 'w').close()
+
+    def warm_version(self, version):
+        """Download every dataset and icon of a patch into cache/<version>/ without touching the live patch."""
+        for language in self.translations:
+            self.warm(version, language)
+        self.pack_images(version)
+        open(os.path.join(self.cache_dir, version, ".complete"), 'w').close()
+
+    def pack_images(self, version):
+        """Move the loose icons of every language of a patch into its content-addressed pack."""
+        image_dirs = [self.language_dir(language, version) for language in sorted(self.translations)]
+        return self.image_store.build(version, image_dirs, self.version_key)
+
+    def icon_response(self, version, language, image_name):
+        """Response for a packed or loose icon, or None when the patch does not have it."""
+        entry = self.image_store.entry(version, image_name)
+        if entry is not None:
+            response = make_response(self.image_store.read(version, image_name))
+            response.mimetype = 'image/webp' if image_name.endswith('.webp') else 'image/png'
+            response.set_etag(entry[3])
+            response.cache_control.max_age = 365 * 24 * 3600
+            return response.make_conditional(request)
+        image_dir = self.language_dir(language, version)
+        if os.path.isfile(os.path.join(image_dir, image_name)):
+            # Absolute, since send_from_directory resolves relative paths against the app's root_path, not the cwd.
+            return send_from_directory(os.path.abspath(image_dir), image_name, max_age=365 * 24 * 3600)
+        return None
+
+    def variant(self, image_name, size):
+        """File name of another size of an icon, e.g. for the 64px detail and 128px quiz images, in a configured size and format."""
+        return self.image_pipeline.best_variant(image_name, size)
+
+    def read_icon(self, version, language, image_name):
+        return self.ddragon.read_icon(version, language, image_name)
+
+    def cache_metrics(self):
+        """Hit/miss counters the dataset store and page cache already keep, for /metrics."""
+        caches = (("dataset", data_store.stats()), ("page", self.page_cache.stats()))
+        yield ("league_cache_hits_total", "counter", "Lookups answered from an in-memory cache.",
+               [({"cache": cache}, stats["hits"]) for cache, stats in caches])
+        yield ("league_cache_misses_total", "counter", "Lookups that had to load or render.",
+               [({"cache": cache}, stats["misses"]) for cache, stats in caches])
+        yield ("league_cache_hit_ratio", "gauge", "Hits over lookups since start.",
+               [({"cache": cache}, stats["hit_ratio"]) for cache, stats in caches])
+        yield ("league_page_cache_bytes", "gauge", "Bytes held by the rendered page cache.",
+               [({}, self.page_cache.size)])
+
+    def prefetch_images(self, version, language, images):
+        """Download (url, name) pairs that are neither packed nor cached loose; returns {name: status}."""
+        statuses = {}
+        missing = []
+        for image_url, image_name in images:
+            if self.image_store.contains(version, image_name):
+                statuses[image_name] = "cached"
+            else:
+                missing.append((image_url, image_name))
+        statuses.update(self.image_fetcher.prefetch(missing, self.language_dir(language, version)))
+        hits = sum(status == "cached" for status in statuses.values())
+        endpoint = current_endpoint()
+        IMAGE_CACHE.inc(endpoint, "hit", amount=hits)
+        IMAGE_CACHE.inc(endpoint, "miss", amount=len(statuses) - hits)
+        return statuses
+
+    def swap_version(self, version):
+        """Point every request at an already warmed patch in one assignment."""
+        with self.swap_lock:
+            old_version = self.latest_version
+            self.prefetched = set()
+            self.sprites = {}
+            self.patch = PatchSnapshot(version, os.path.join(self.cache_dir, version))
+        if old_version != version:
+            data_store.invalidate(version=old_version)
+            self.page_cache.invalidate(version=old_version)
+
+
+    def get_champions(self, language):
+        version = self.latest_version
+        champions_data = self.get_data("championFull", language)
+        if (version, language, "champions") not in self.prefetched:
+            images = [(self.image_url('champion', champion_id, version), f"{champion_id}.png") for champion_id in champions_data]
+            self.prefetch_images(version, language, images)
+            self.prefetched.add((version, language, "champions"))
+        return champions_data
+
+    def get_item_index(self, language):
+        version = self.latest_version
+        items_data = self.get_data("item", language)
+        item_index = data_store.get(version, language, "item_index", lambda: ItemIndex(items_data, clean_text))
+        if (version, language, "items") not in self.prefetched:
+            images = [(self.image_url('item', item['id'], version), f"{item['id']}.png") for _, item in item_index.shop_items]
+            self.prefetch_images(version, language, images)
+            self.prefetched.add((version, language, "items"))
+        return item_index
+
+    def quiz_size(self, kind, version, language):
+        if kind == "items":
+            return len(self.get_item_index(language).shop_positions)
+        return len(self.get_data("championFull", language, version))
+
+    def quiz_question(self, kind, session, position, number):
+        """Question `number` of a deck as JSON-ready data, plus the (url, name) of the icons it shows."""
+        version, language = session.version, session.language
+        rng = session.rng(position)
+        if kind == "items":
+            item, options = self.get_item_index(language).question(number, 3, rng)
+            options.append(item['name'])
+            rng.shuffle(options)
+            question = {
+                "position": position,
+                "image": url_for('serve_image', version=version, language=language, image_name=self.variant(f"{item['id']}.png", 128)),
+                "options": options,
+                "correct_answer": item['name']
+            }
+            return question, [(self.image_url('item', item['id'], version), f"{item['id']}.png")]
+
+        champions_data = self.get_data("championFull", language, version)
+        champion_ids = data_store.get(version, language, "champion_ids", lambda: tuple(champions_data))
+        champion_id = champion_ids[number]
+        spells = champions_data[champion_id]['spells']
+        spell_index = rng.randrange(len(spells))
+        spell = spells[spell_index]
+        incorrect_spells = [s['name'] for s in spells if s['name'] != spell['name']]
+        options = rng.sample(incorrect_spells, min(3, len(incorrect_spells))) + [spell['name']]
+        rng.shuffle(options)
+        question = {
+            "position": position,
+            "champion_image": url_for('serve_image', version=version, language=language, image_name=self.variant(f"{champion_id}.png", 128)),
+            "ability_image": url_for('serve_image', version=version, language=language, image_name=self.variant(f"{spell['id']}.png", 128)),
+            "spell_keybind": self.spell_keybind_map.get(spell_index, ''),
+            "options": options,
+            "correct_answer": spell['name']
+        }
+        return question, [(self.image_url('champion', champion_id, version), f"{champion_id}.png"), (self.image_url('spell', spell['id'], version), f"{spell['id']}.png")]
+
+    def start_quiz(self, kind, language):
+        """(session id, session, first question) of a new quiz, or None when the live patch has no questions.
+
+        A patch swap between starting the session and dealing makes its id stale, so it is
+        started again on the new patch.
+        """
+        for _ in range(3):
+            session_id = self.quiz.start(self.latest_version, language)
+            batch = self.deal_quiz(kind, session_id, 1)
+            if batch is not None:
+                session, questions = batch
+                return (session_id, session, questions[0]) if questions else None
+        return None
+
+    def deal_quiz(self, kind, session_id, n, offset=None):
+        """(session, questions) for the next n questions of a session, or None when the id is bad or from an older patch.
+
+        The icons of the whole batch are fetched in one prefetch_images call, so the client can
+        preload them instead of waiting on a download per question.
+        """
+        parsed = self.quiz.parse(session_id)
+        if parsed is None or parsed[0] != self.latest_version or parsed[1] not in self.translations:
+            return None
+        session, cards = self.quiz.deal(kind, session_id, n, lambda version, language: self.quiz_size(kind, version, language), offset)
+        questions = []
+        images = []
+        for position, number in cards:
+            question, question_images = self.quiz_question(kind, session, position, number)
+            questions.append(question)
+            images.extend(question_images)
+        if images:
+            self.prefetch_images(session.version, session.language, images)
+        return session, questions
+
+    def get_search_index(self, kind, language, version=None):
+        """Search index over champions or map 11 items, built once per loaded dataset."""
+        version = version or self.latest_version
+        if kind == "champion":
+            data = self.get_data("championFull", language, version)
+            return data_store.get(version, language, "champion_search", lambda: SearchIndex(champion_entries(data)))
+        data = self.get_data("item", language, version)
+        return data_store.get(version, language, "item_search", lambda: SearchIndex(item_entries(data)))
+
+    def get_champion_stats(self, language, version=None):
+        version = version or self.latest_version
+        champions_data = self.get_data("championFull", language, version)
+        return data_store.get(version, language, "champion_stats", lambda: ChampionStats(champions_data))
+
+    def get_item_graph(self, language, version=None):
+        version = version or self.latest_version
+        items_data = self.get_data("item", language, version)
+        return data_store.get(version, language, "item_graph", lambda: ItemGraph(items_data, clean_text))
+
+    def get_catalog(self, kind, language, version=None):
+        """Pre-serialized records behind /api/champions or /api/items, built once per loaded dataset."""
+        version = version or self.latest_version
+        if kind == "champions":
+            data = self.get_data("championFull", language, version)
+            descriptions = self.get_descriptions("championFull", language, version)
+            return data_store.get(version, language, "champions_catalog", lambda: Catalog(version, champion_records(data, descriptions), ('name', 'id', 'tag')))
+        data = self.get_data("item", language, version)
+        descriptions = self.get_descriptions("item", language, version)
+        return data_store.get(version, language, "items_catalog", lambda: Catalog(version, item_records(data, descriptions), ('name', 'id', 'tag', 'gold')))
+
+    def api_page(self, kind):
+        """One page of a catalog, served from the page cache in the best content coding the client accepts.
+
+        ?fields=id,name  ?tag=Fighter,Tank (all of them)  ?map=11,12 (any of them, items only)
+        ?sort=name|-gold|...  ?limit=1..200  ?cursor=<next from the previous page>
+        """
+        language = self.resolve_language()
+        args = request.args
+        split = lambda name: tuple(value for value in args.get(name, '').split(',') if value)
+        query = (split('fields'), args.get('sort', 'name'), split('tag'), split('map'), args.get('cursor'), min(max(args.get('limit', 50, type=int), 1), 200))
+        key = (self.latest_version, language, 'api', kind, query)
+        page = self.page_cache.get(key)
+        if page is None:
+            try:
+                body = self.get_catalog(kind, language, key[0]).page(*query)
+            except CatalogError as e:
+                return jsonify({"error": str(e)}), 400
+            variants = encode_variants(body)
+            page = (variants, hashlib.sha1(variants['identity']).hexdigest())
+            self.page_cache.put(key, page, sum(len(data) for data in variants.values()))
+        variants, etag = page
+        if request.if_none_match.contains(etag):
+            response = make_response('', 304)
+        else:
+            coding = next((coding for coding in ('br', 'gzip') if coding in variants and request.accept_encodings[coding]), 'identity')
+            response = make_response(variants[coding])
+            response.mimetype = 'application/json'
+            if coding != 'identity':
+                response.headers['Content-Encoding'] = coding
+        response.set_etag(etag)
+        response.cache_control.no_cache = True
+        response.vary.update(('Accept-Encoding', 'Cookie', 'Accept-Language'))
+        return response
 
-    def fetch_image(self, image_url, image_name):
-        image_path = os.path.join(self.full_dir, image_name)
-        print(image_path)
-        if os.path.exists(image_path):
-            return image_name
-        try:
-            img_data = requests.get(image_url).content
-            img = Image.open(io.BytesIO(img_data)).resize((32, 32))
-            img.save(image_path)
+    def get_sprite(self, kind, names, language):
+        """Return the icon atlas offsets for a grid page, building cache/<version>/<lang>/sprites/<kind>.png once."""
+        version = self.latest_version
+        key = (version, language, kind)
+        sprite = self.sprites.get(key)
+        if sprite is None or (sprite[1] and self.icons_arrived(version, language, sprite[1])):
+            image_dir = self.language_dir(language, version)
+            sprite_path = os.path.join(image_dir, "sprites", f"{kind}.png")
+            sprite = load_sprite(sprite_path)
+            if sprite is None or not sprite[0].keys() >= set(names) or (sprite[1] and self.icons_arrived(version, language, sprite[1])):
+                sprite = build_sprite(lambda name: self.read_icon(version, language, name), names, sprite_path)
+            self.sprites[key] = sprite
+        if sprite[1]:
+            self.refetch_icons(version, language, kind, sprite[1])
+        return sprite[0]
+
+    def icons_arrived(self, version, language, names):
+        """Whether any of `names`, missing from a sprite, is now packed or cached loose."""
+        return any(self.image_store.contains(version, name) or os.path.exists(os.path.join(self.language_dir(language, version), name)) for name in names)
+
+    def refetch_icons(self, version, language, kind, names):
+        """Retry the downloads of icons a sprite is missing on a background thread, one at a time per sprite.
+
+        Failures stay in the fetcher's negative cache for a minute, so this costs one attempt per
+        icon per minute while the CDN is failing.
+        """
+        key = (version, language, kind)
+        with self.swap_lock:
+            if key in self.refetching:
+                return
+            self.refetching.add(key)
+        image_kind = "champion" if kind == "champions" else "item"
+        images = [(self.image_url(image_kind, os.path.splitext(name)[0], version), name) for name in names]
+
+        def work():
+            try:
+                self.prefetch_images(version, language, images)
+            finally:
+                self.refetching.discard(key)
+
+        threading.Thread(target=work, name="sprite-refetch", daemon=True).start()
+
+    def render_champion_page(self, champion_id, language):
+        """Rendered /champion/<id> HTML from the page cache, or None for an unknown champion."""
+        key = (self.latest_version, language, 'champion', champion_id)
+        html = self.page_cache.get(key)
+        if html is not None:
+            return html
+        champion = self.get_data("championFull", language, key[0]).get(champion_id, None)
+        if not champion:
+            return None
+        champion = dict(champion)
+        descriptions = self.get_descriptions("championFull", language, key[0])[champion_id]
+        champion['spells'] = [dict(spell, description=description) for spell, description in zip(champion['spells'], descriptions)]
+        image = self.fetch_image(self.image_url('champion', champion_id, key[0]), f"{champion_id}.png", language)
+        champion_stats = self.get_champion_stats(language, key[0])
+        stats = zip(champion_stats.at_level(champion_id, 1), champion_stats.at_level(champion_id, MAX_LEVEL))
+        html = render_template('champion_details.html', champion=champion, image=self.variant(image, 64), stats=[(stat, first, last) for (stat, first), (_, last) in stats], max_level=MAX_LEVEL, language=language, translations=self.translations[language])
+        self.page_cache.put(key, html)
+        return html
+
+    def render_item_page(self, item_id, language):
+        """Rendered /item/<id> HTML from the page cache, or None for an unknown item."""
+        key = (self.latest_version, language, 'item', item_id)
+        html = self.page_cache.get(key)
+        if html is not None:
+            return html
+        item = self.get_data("item", language, key[0]).get(item_id, None)
+        if not item:
+            return None
+        item = dict(item, description=self.get_descriptions("item", language, key[0])[item_id])
+        item_graph = self.get_item_graph(language, key[0])
+        components, builds_into = item_graph.direct(item_id)
+        image = self.fetch_image(self.image_url('item', item_id, key[0]), f"{item_id}.png", language)
+        html = render_template('item_details.html', language=language, item=item, item_id=item_id, image=self.variant(image, 64),
+                               components=components, builds_into=builds_into, tree=item_graph.tree(item_graph.by_id[item_id]),
+                               translations=self.translations[language])
+        self.page_cache.put(key, html)
+        return html
+
+    def prerender(self):
+        """Render every champion and item detail page of the live patch into the page cache."""
+        with self.app.test_request_context():
+            for language in self.translations:
+                for champion_id in self.get_data("championFull", language):
+                    self.render_champion_page(champion_id, language)
+                for item_id in self.get_data("item", language):
+                    self.render_item_page(item_id, language)
+
+    def get_descriptions(self, data_type, language, version=None):
+        """Markup-free descriptions of a dataset, built once when the dataset is loaded."""
+        version = version or self.latest_version
+        data = self.get_data(data_type, language, version)
+        build = champion_descriptions if data_type == "championFull" else item_descriptions
+        return data_store.get(version, language, f"{data_type}_descriptions", lambda: build(data))
+
+    def get_data(self, data_type, language, version=None):
+        version = version or self.latest_version
+        return data_store.get(version, language, data_type, lambda: self.load_data(version, language, data_type))
+
+    def load_data(self, version, language, data_type):
+        return self.ddragon.load_data(version, language, data_type)
+
+    def fetch_image(self, image_url, image_name, language):
+        """Name of an icon for a page; one neither packed nor cached loose is downloaded on a background thread.
+
+        Pages never wait on the CDN: serve_image answers with the placeholder, cached for a
+        minute, until the download lands.
+        """
+        image_path = os.path.join(self.language_dir(language), image_name)
+        if self.image_store.contains(self.latest_version, image_name) or os.path.isfile(image_path):
+            IMAGE_CACHE.inc(current_endpoint(), "hit")
             return image_name
-        except Exception as e:
-            print(f"Error fetching image from URL: {image_url}, error: {e}")
-            return Image.new('RGB', (32, 32), color='gray')
-
+        IMAGE_CACHE.inc(current_endpoint(), "miss")
+        log.debug("Fetching %s", image_path)
+        threading.Thread(target=self.image_fetcher.fetch, args=(image_url, image_path, current_endpoint()), name="icon-fetch", daemon=True).start()
+        return image_name
+
+    def page_images(self, language, version=None):
+        """(url, name) pairs of the icons every champion and item detail page shows, map 11 or not."""
+        version = version or self.latest_version
+        images = [(self.image_url('champion', champion_id, version), f"{champion_id}.png") for champion_id in self.get_data("championFull", language, version)]
+        images += [(self.image_url('item', item_id, version), f"{item_id}.png") for item_id in self.get_data("item", language, version)]
+        return images
+
+
+    def prewarm(self, prerender=False):
+        """Load every dataset, index, icon and sprite of the live patch, pack its icons, then report ready."""
+        for language in self.translations:
+            champions_data = self.get_champions(language)
+            item_index = self.get_item_index(language)
+            self.get_descriptions("championFull", language)
+            self.get_descriptions("item", language)
+            self.get_search_index("champion", language)
+            self.get_search_index("item", language)
+            self.get_catalog("champions", language)
+            self.get_catalog("items", language)
+            self.get_item_graph(language)
+            self.get_champion_stats(language)
+            self.get_sprite("champions", [f"{champion_id}.png" for champion_id in champions_data], language)
+            self.get_sprite("items", [f"{item['id']}.png" for _, item in item_index.shop_items], language)
+            if prerender:
+                # Every icon the pages link, in one concurrent batch, so they are packed below.
+                self.prefetch_images(self.latest_version, language, self.page_images(language))
+        self.pack_images(self.latest_version)
+        if prerender:
+            self.prerender()
+        self.ready.set()
 
     def run(self):
-        self.app.run(debug=True, host='0.0.0.0', port=10000)
+        self.ready.set()
+        self.poller.start()
+        self.app.run(debug=True, host='0.0.0.0', port=10000, use_reloader=False)
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="League Viewer")
+    parser.add_argument("--warm", nargs=2, metavar=("VERSION", "LANGUAGE"), help="pre-populate the image cache and exit")
+    parser.add_argument("--import-bundle", metavar="TGZ", help="load a dragontail-<version>.tgz or exported bundle into the cache and exit")
+    parser.add_argument("--export-bundle", nargs=2, metavar=("VERSION", "TGZ"), help="write a cached patch to a bundle and exit")
+    parser.add_argument("--log-level", default="INFO", choices=["DEBUG", "INFO", "WARNING", "ERROR"])
+    parser.add_argument("--log-sample", type=int, default=100, metavar="N", help="log 1 in N repeats of each message below ERROR")
+    args = parser.parse_args()
+    logs.configure(args.log_level, args.log_sample)
+
+    if args.import_bundle or args.export_bundle:
+        import bundle
+        viewer = LeagueViewer(offline=True)
+        if args.import_bundle:
+            print(f"Imported {bundle.import_bundle(viewer, args.import_bundle)}")
+        else:
+            bundle.export_bundle(viewer, *args.export_bundle)
+            print(f"Exported {args.export_bundle[0]} to {args.export_bundle[1]}")
+        raise SystemExit
+
     viewer = LeagueViewer()
-    viewer.run()
+    if args.warm:
+        version, language = args.warm
+        statuses = viewer.warm(version, language)
+        failed = sorted(name for name, status in statuses.items() if status == "failed")
+        print(f"Warmed {len(statuses) - len(failed)}/{len(statuses)} images for {version} {language}")
+        if failed:
+            print("Failed: " + ", ".join(failed))
+    else:
+        viewer.run()
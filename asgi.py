@@ -0,0 +1,9 @@
+# uvicorn asgi:app --port 10000
+from threaded_asgi import ThreadedWsgiToAsgi
+
+from wsgi import create_app
+
+# Cache misses, icons and datasets alike, are downloaded on a shared asyncio loop; icons are
+# fetched concurrently and coalesced per destination.
+# Requests run on a thread pool, so one waiting on the CDN does not hold up the others.
+app = ThreadedWsgiToAsgi(create_app(async_fetch=True))
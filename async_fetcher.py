@@ -0,0 +1,122 @@
+import asyncio
+import os
+import threading
+import time
+
+import httpx
+
+from image_pipeline import ImagePipeline
+from single_flight import NegativeCache
+from metrics import DDRAGON_SECONDS, DDRAGON_FETCHES, current_endpoint, fetch_result
+from logs import get_logger
+
+log = get_logger("async_fetcher")
+
+
+class AsyncImageFetcher:
+    """Drop-in replacement for ImageFetcher that downloads on one shared asyncio loop.
+
+    The loop runs on a daemon thread and owns a single httpx.AsyncClient. Downloads of the same
+    URL that overlap are coalesced: every caller awaits the one in-flight task. Decoding and
+    resizing go to the ImagePipeline's process pool. get() puts Data Dragon's JSON (datasets,
+    versions.json) on the same client, so DataDragon can use it in place of requests.
+    """
+
+    def __init__(self, max_connections=32, pipeline=None, not_found_ttl=3600, failure_ttl=60):
+        self.max_connections = max_connections
+        self.pipeline = pipeline or ImagePipeline()
+        self.not_found_ttl = not_found_ttl
+        self.failure_ttl = failure_ttl
+        self.failures = NegativeCache()
+        self.loop = None
+        self.client = None
+        self.inflight = {}
+        self.downloads = 0
+        self.coalesced = 0
+        self._start_lock = threading.Lock()
+
+    def start(self):
+        with self._start_lock:
+            if self.loop is not None:
+                return
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="image-fetch-loop", daemon=True).start()
+            asyncio.run_coroutine_threadsafe(self._open_client(), loop).result()
+            self.loop = loop
+
+    async def _open_client(self):
+        limits = httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_connections)
+        self.client = httpx.AsyncClient(timeout=10, limits=limits)
+
+    def submit(self, coroutine):
+        """Schedule a coroutine on the fetch loop and return a concurrent.futures.Future."""
+        self.start()
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+
+    def get(self, url, timeout=10):
+        """GET url on the loop's client; transport errors are raised as OSError, like requests' errors."""
+        try:
+            return self.submit(self.get_async(url, timeout)).result()
+        except httpx.HTTPError as e:
+            raise OSError(f"GET {url} failed: {e}") from e
+
+    async def get_async(self, url, timeout):
+        return await self.client.get(url, timeout=timeout)
+
+    async def fetch_async(self, image_url, image_path, endpoint="background"):
+        if os.path.exists(image_path):
+            return "cached"
+        if image_url in self.failures:
+            return "failed"
+        # Keyed on the path too: the same icon fetched for two languages goes to two directories.
+        key = (image_url, image_path)
+        task = self.inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._download(image_url, image_path, endpoint))
+            self.inflight[key] = task
+            task.add_done_callback(lambda _: self.inflight.pop(key, None))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    async def _download(self, image_url, image_path, endpoint):
+        status_code = None
+        started = time.perf_counter()
+        try:
+            response = await self.client.get(image_url)
+            status_code = response.status_code
+            DDRAGON_SECONDS.observe(time.perf_counter() - started, endpoint, "image")
+            if response.status_code == 404:
+                self.failures.add(image_url, self.not_found_ttl)
+                return "failed"
+            response.raise_for_status()
+            self.downloads += 1
+            variants = await asyncio.wrap_future(self.pipeline.submit(response.content, endpoint))
+            await asyncio.get_running_loop().run_in_executor(None, self.pipeline.save, variants, image_path)
+            return "downloaded"
+        except Exception as e:
+            log.warning("Error fetching image from URL: %s, error: %s", image_url, e)
+            self.failures.add(image_url, self.failure_ttl)
+            return "failed"
+        finally:
+            DDRAGON_FETCHES.inc(endpoint, "image", fetch_result(status_code))
+
+    async def prefetch_async(self, images, image_dir, endpoint="background"):
+        images = list(images)
+        statuses = await asyncio.gather(*(self.fetch_async(url, os.path.join(image_dir, name), endpoint) for url, name in images))
+        return {name: status for (_, name), status in zip(images, statuses)}
+
+    def fetch(self, image_url, image_path, endpoint=None):
+        """Return 'cached', 'downloaded' or 'failed' for a single icon; metrics go to `endpoint` (default: the current one)."""
+        if os.path.exists(image_path):
+            return "cached"
+        if image_url in self.failures:
+            return "failed"
+        return self.submit(self.fetch_async(image_url, image_path, endpoint or current_endpoint())).result()
+
+    def prefetch(self, images, image_dir):
+        """Fetch (url, name) pairs into image_dir concurrently and return {name: status}."""
+        images = list(images)
+        if not images:
+            return {}
+        return self.submit(self.prefetch_async(images, image_dir, current_endpoint())).result()
@@ -0,0 +1,392 @@
+import argparse
+import json
+import os
+import re
+import statistics
+import threading
+import time
+
+from app import LeagueViewer, data_store
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    return {
+        "p50": statistics.median(samples) * 1000,
+        "p99": samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1000,
+    }
+
+
+def time_requests(client, path, requests_count, before_each=None):
+    samples = []
+    for _ in range(requests_count):
+        if before_each:
+            before_each()
+        start = time.perf_counter()
+        response = client.get(path)
+        samples.append(time.perf_counter() - start)
+        assert response.status_code == 200, response.status_code
+    return percentiles(samples)
+
+
+def bench_champion_page(args):
+    """Compare /champion/<id> latency with the old get_data, the shared DataStore and the page cache.
+
+    The old get_data requested versions.json and json.load()ed the raw dataset on every call;
+    the baseline run swaps it back in. The first two runs clear the page cache (and the
+    baseline the DataStore) before every request, or they would only time cache hits.
+    """
+    viewer = LeagueViewer()
+    client = viewer.app.test_client()
+    path = f"/champion/{args.champion}"
+    client.get(path)
+
+    def old_get_data(data_type, language, version=None):
+        viewer.get_latest_version()
+        version = version or viewer.latest_version
+        with open(os.path.join(viewer.language_dir(language, version), f"{data_type}.json"), 'r') as file:
+            return json.load(file)
+
+    def reload_everything():
+        data_store.invalidate()
+        viewer.page_cache.invalidate()
+
+    viewer.get_data = old_get_data
+    try:
+        before = time_requests(client, path, args.requests, before_each=reload_everything)
+    finally:
+        del viewer.get_data
+    data_store.invalidate()
+    after = time_requests(client, path, args.requests, before_each=viewer.page_cache.invalidate)
+    cached = time_requests(client, path, args.requests)
+    print(f"{path} x{args.requests}")
+    print(f"  old get_data:       p50={before['p50']:.2f}ms p99={before['p99']:.2f}ms")
+    print(f"  DataStore:          p50={after['p50']:.2f}ms p99={after['p99']:.2f}ms")
+    print(f"  page cache:         p50={cached['p50']:.2f}ms p99={cached['p99']:.2f}ms")
+    print(f"  store stats: {data_store.stats()}")
+    print(f"  page cache stats: {viewer.page_cache.stats()}")
+
+
+def bench_load(args):
+    """Hammer a running server (python app.py, python wsgi.py or gunicorn -c gunicorn.conf.py) and report req/s."""
+    import requests
+
+    paths = [f"/champion/{args.champion}", "/champions", "/items", "/quiz/items/batch?n=10"]
+    deadline = time.perf_counter() + args.duration
+    samples = []
+    errors = []
+    lock = threading.Lock()
+
+    def worker():
+        session = requests.Session()
+        local_samples, local_errors, index = [], 0, 0
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            response = session.get(args.url + paths[index % len(paths)])
+            local_samples.append(time.perf_counter() - start)
+            local_errors += response.status_code != 200
+            index += 1
+        with lock:
+            samples.extend(local_samples)
+            errors.append(local_errors)
+
+    threads = [threading.Thread(target=worker) for _ in range(args.concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    latency = percentiles(samples)
+    print(f"{args.url} concurrency={args.concurrency} duration={args.duration}s")
+    print(f"  {len(samples) / args.duration:.1f} req/s, {sum(errors)} errors, p50={latency['p50']:.2f}ms p99={latency['p99']:.2f}ms")
+
+
+def strip_html_tags(text):
+    # LeagueViewer.strip_html_tags before descriptions.clean_text replaced it.
+    text = text.replace('<br>', '\n').replace('<br />', '\n').replace('<br/>', '\n')
+    clean = re.compile('<.*?>')
+    return re.sub(clean, '', text)
+
+
+def bench_descriptions(args):
+    """Clean every spell and item description of a cached patch with the old and the new sanitizer."""
+    from descriptions import clean_text, champion_descriptions, item_descriptions
+
+    if not args.data_dir:
+        raise SystemExit("descriptions needs --data-dir cache/<version>/<language>")
+    with open(os.path.join(args.data_dir, "championFull.json")) as file:
+        champions_data = json.load(file)
+    with open(os.path.join(args.data_dir, "item.json")) as file:
+        items_data = json.load(file)
+    texts = [spell['description'] for champion in champions_data.values() for spell in champion['spells']]
+    texts += [item['description'] for item in items_data.values()]
+
+    def run(function):
+        start = time.perf_counter()
+        for _ in range(args.requests):
+            for text in texts:
+                function(text)
+        return (time.perf_counter() - start) / args.requests * 1000
+
+    old = run(strip_html_tags)
+    new = run(clean_text)
+    start = time.perf_counter()
+    champion_descriptions(champions_data)
+    item_descriptions(items_data)
+    build = (time.perf_counter() - start) * 1000
+    print(f"{len(texts)} descriptions from {args.data_dir}")
+    print(f"  strip_html_tags: {old:.2f}ms per pass")
+    print(f"  clean_text:      {new:.2f}ms per pass ({old / new:.1f}x)")
+    print(f"  ahead-of-time tables built once in {build:.2f}ms, then served by dict lookup")
+
+
+def bench_dataset_memory(args):
+    """Compare load time and resident size of the raw JSON datasets with their compact projections."""
+    import gc
+    import tracemalloc
+    from compact import project, compact_path, load_compact, save_compact
+
+    if not args.data_dir:
+        raise SystemExit("dataset-memory needs --data-dir cache/<version>/<language>")
+    for data_type in ("championFull", "item"):
+        json_path = os.path.join(args.data_dir, f"{data_type}.json")
+        with open(json_path) as file:
+            save_compact(compact_path(json_path), project(data_type, json.load(file)))
+
+        def measure(load):
+            gc.collect()
+            tracemalloc.start()
+            start = time.perf_counter()
+            data = load()
+            elapsed = (time.perf_counter() - start) * 1000
+            size = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            del data
+            return elapsed, size / 1024 / 1024
+
+        def load_json():
+            with open(json_path) as file:
+                return json.load(file)
+
+        json_ms, json_mb = measure(load_json)
+        compact_ms, compact_mb = measure(lambda: load_compact(compact_path(json_path)))
+        print(f"{data_type}")
+        print(f"  json:    {json_ms:7.2f}ms {json_mb:6.2f}MiB")
+        print(f"  compact: {compact_ms:7.2f}ms {compact_mb:6.2f}MiB")
+
+
+def bench_transcode(args):
+    """Transcode every PNG in --data-dir into all configured variants with 1..N worker processes."""
+    from image_pipeline import ImagePipeline
+
+    if not args.data_dir:
+        raise SystemExit("transcode needs --data-dir with source PNGs (e.g. an unpacked dragontail img/champion)")
+    sources = []
+    for name in sorted(os.listdir(args.data_dir)):
+        if name.endswith('.png'):
+            with open(os.path.join(args.data_dir, name), 'rb') as file:
+                sources.append(file.read())
+    workers = 1
+    while workers <= (os.cpu_count() or 1):
+        pipeline = ImagePipeline(workers=workers)
+        list(pipeline.executor.map(int, range(workers)))  # start the workers outside the timing
+        start = time.perf_counter()
+        for future in [pipeline.submit(data) for data in sources]:
+            future.result()
+        elapsed = time.perf_counter() - start
+        pipeline.executor.shutdown()
+        print(f"  {workers:2d} workers: {len(sources) / elapsed:8.1f} images/s ({len(pipeline.sizes) * len(pipeline.formats)} variants each)")
+        workers *= 2
+
+
+def bench_search(args):
+    """Compare /api/search lookups with the substring scan the grids used to do on every keystroke."""
+    from compact import project
+    from search_index import SearchIndex, champion_entries, item_entries, fold
+
+    if not args.data_dir:
+        raise SystemExit("search needs --data-dir cache/<version>/<language>")
+    with open(os.path.join(args.data_dir, "championFull.json")) as file:
+        champions_data = project("championFull", json.load(file))
+    with open(os.path.join(args.data_dir, "item.json")) as file:
+        items_data = project("item", json.load(file))
+    start = time.perf_counter()
+    indexes = {"champion": SearchIndex(champion_entries(champions_data)), "item": SearchIndex(item_entries(items_data))}
+    print(f"indexes built in {(time.perf_counter() - start) * 1000:.2f}ms")
+
+    for kind, index in indexes.items():
+        queries = [fold(name)[:length] for name in index.names for length in (1, 3, 6)]
+        scan_start = time.perf_counter()
+        for query in queries:
+            [name for name in index.names if query in fold(name)]
+        scan = (time.perf_counter() - scan_start) / len(queries) * 1e6
+        samples = []
+        for query in queries:
+            start = time.perf_counter()
+            index.search(query)
+            samples.append(time.perf_counter() - start)
+        latency = percentiles(samples)
+        print(f"{kind}: {len(index)} entries, {len(queries)} queries")
+        print(f"  substring scan: {scan:8.1f}us per query")
+        print(f"  SearchIndex:    p50={latency['p50'] * 1000:.1f}us p99={latency['p99'] * 1000:.1f}us")
+
+
+def bench_stats(args):
+    """Compare every champion's stats at levels 1-18 computed per champion in Python and as one NumPy broadcast."""
+    from compact import project
+    from champion_stats import ChampionStats, STATS, MAX_LEVEL, growth_factor
+
+    if not args.data_dir:
+        raise SystemExit("stats needs --data-dir cache/<version>/<language>")
+    with open(os.path.join(args.data_dir, "championFull.json")) as file:
+        champions_data = project("championFull", json.load(file))
+
+    def python_loop():
+        table = {}
+        for champion_id, champion in champions_data.items():
+            stats = champion['stats']
+            rows = []
+            for level in range(1, MAX_LEVEL + 1):
+                factor = growth_factor(level)
+                row = []
+                for name, base_key, growth_key in STATS:
+                    base = stats.get(base_key, 0.0)
+                    growth = stats.get(growth_key, 0.0) if growth_key else 0.0
+                    if name == "attackspeed":
+                        growth *= base / 100
+                    row.append(base + growth * factor)
+                rows.append(row)
+            table[champion_id] = rows
+        return table
+
+    def top_armor_python():
+        table = python_loop()
+        armor = [name for name, _, _ in STATS].index("armor")
+        return sorted(table, key=lambda champion_id: -table[champion_id][10][armor])[:10]
+
+    def run(function):
+        start = time.perf_counter()
+        for _ in range(args.requests):
+            function()
+        return (time.perf_counter() - start) / args.requests * 1000
+
+    loop = run(python_loop)
+    matrix = run(lambda: ChampionStats(champions_data))
+    champion_stats = ChampionStats(champions_data)
+    top_loop = run(top_armor_python)
+    top_matrix = run(lambda: champion_stats.top("armor", 11))
+    print(f"{len(champions_data)} champions x {len(STATS)} stats x {MAX_LEVEL} levels")
+    print(f"  all levels, python loop:  {loop:.3f}ms")
+    print(f"  all levels, ChampionStats: {matrix:.3f}ms (including building the matrices, {loop / matrix:.1f}x)")
+    print(f"  top 10 armor at 11, python loop:  {top_loop:.3f}ms")
+    print(f"  top 10 armor at 11, precomputed:  {top_matrix:.3f}ms ({top_loop / top_matrix:.1f}x)")
+
+
+def bench_tk_grid(args):
+    """Keystroke-to-repaint latency of the Tk champion grid: rebuild every widget vs VirtualGrid. Run under xvfb-run."""
+    import sys
+    import tkinter as tk
+
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "exe_version"))
+    from virtual_grid import VirtualGrid
+
+    if args.data_dir:
+        with open(os.path.join(args.data_dir, "championFull.json")) as file:
+            names = {champion_id: champion['name'] for champion_id, champion in json.load(file).items()}
+    else:
+        names = {f"Champion{index}": f"Champion {index}" for index in range(170)}
+    root = tk.Tk()
+    root.geometry("1680x1000")
+    images = {champion_id: tk.PhotoImage(width=32, height=32) for champion_id in names}
+    # Type the first letters of a few names and delete them again, one keystroke at a time.
+    terms = []
+    for name in list(names.values())[:: max(1, len(names) // 8)]:
+        typed = name.lower()[:5]
+        terms += [typed[:length] for length in range(1, len(typed) + 1)]
+        terms += [typed[:length] for length in range(len(typed) - 1, -1, -1)]
+
+    def matching(term):
+        return [champion_id for champion_id, name in names.items() if term in name.lower()]
+
+    rebuild_frame = tk.Frame(root)
+    rebuild_frame.pack(fill="both", expand=True)
+
+    def rebuild(term):
+        # league_main.update_champion_grid before VirtualGrid
+        for widget in rebuild_frame.winfo_children():
+            widget.destroy()
+        for index, champion_id in enumerate(matching(term)):
+            tk.Label(rebuild_frame, text=names[champion_id], wraplength=72).grid(row=index // 20, column=index % 20, padx=3, pady=(0, 20))
+            tk.Button(rebuild_frame, image=images[champion_id]).grid(row=index // 20, column=index % 20, padx=5, pady=(60, 0))
+
+    def measure(update):
+        samples = []
+        for _ in range(max(1, args.requests // len(terms))):
+            for term in terms:
+                start = time.perf_counter()
+                update(term)
+                root.update()
+                samples.append(time.perf_counter() - start)
+        return percentiles(samples)
+
+    root.update()
+    before = measure(rebuild)
+    rebuild_frame.destroy()
+    grid = VirtualGrid(root, names.get, images.get, lambda champion_id: None)
+    grid.frame.pack(fill="both", expand=True)
+    root.update()
+    after = measure(lambda term: grid.show(matching(term)))
+    root.destroy()
+    print(f"{len(names)} champions, {len(terms)} keystrokes")
+    print(f"  rebuild all widgets: p50={before['p50']:.2f}ms p99={before['p99']:.2f}ms")
+    print(f"  VirtualGrid:         p50={after['p50']:.2f}ms p99={after['p99']:.2f}ms ({len(grid.cells)} pooled cells)")
+
+
+def bench_import_time(args):
+    """Cumulative import time of the shared core and the front ends, from python -X importtime in a fresh process."""
+    import subprocess
+    import sys
+
+    root = os.path.dirname(os.path.abspath(__file__))
+    modules = ["league_core", "image_fetcher", "search_index", "item_index", "champion_stats", "app"]
+    for module in modules:
+        samples = []
+        for _ in range(max(1, args.requests // 40)):
+            result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=root, capture_output=True, text=True)
+            if result.returncode != 0:
+                samples = None
+                break
+            for line in result.stderr.splitlines():
+                fields = line.split("|")
+                if len(fields) == 3 and fields[2].strip() == module:
+                    samples.append(int(fields[1]) / 1000)
+        if samples is None:
+            print(f"  {module:15s} not importable here")
+        else:
+            print(f"  {module:15s} {statistics.median(samples):8.1f}ms")
+
+
+BENCHMARKS = {
+    "import-time": bench_import_time,
+    "tk-grid": bench_tk_grid,
+    "stats": bench_stats,
+    "search": bench_search,
+    "transcode": bench_transcode,
+    "dataset-memory": bench_dataset_memory,
+    "descriptions": bench_descriptions,
+    "champion-page": bench_champion_page,
+    "load": bench_load,
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="League Viewer micro-benchmarks")
+    parser.add_argument("benchmark", choices=sorted(BENCHMARKS))
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--champion", default="Ahri")
+    parser.add_argument("--url", default="http://127.0.0.1:10000")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--data-dir", help="cache/<version>/<language> holding championFull.json and item.json")
+    args = parser.parse_args()
+    BENCHMARKS[args.benchmark](args)
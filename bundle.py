@@ -0,0 +1,106 @@
+import os
+import re
+import shutil
+import tarfile
+import json
+
+from image_pipeline import write_atomic
+
+# Dragontail image folders the site uses; everything else (splash art, loading screens, ...) is skipped.
+ICON_KINDS = ('champion', 'item', 'spell')
+DATA_TYPES = ('championFull', 'item')
+VERSION_RE = re.compile(r'\d+\.\d+\.\d+')
+
+
+def import_bundle(viewer, bundle_path, languages=None):
+    """Stream a dragontail-<version>.tgz or an export_bundle archive into the cache in one pass.
+
+    Icons are transcoded on the viewer's ImagePipeline worker processes, then the patch is packed,
+    indexed and marked complete, so the node can serve it without network access. Returns the
+    imported version.
+
+    The packs of an export are never copied over local ones: their layout depends on which
+    icons the exporting node packed, and local indexes (of this patch or of newer patches
+    deduplicated into it) hold their own offsets. The exported icons are unpacked and
+    repacked against this cache instead.
+    """
+    languages = tuple(languages or viewer.translations)
+    cache_dir = os.path.abspath(viewer.cache_dir)
+    version = None
+    transcoded = {}
+    with tarfile.open(bundle_path, 'r|*') as archive:
+        for member in archive:
+            parts = member.name.lstrip('./').split('/')
+            if not member.isfile() or len(parts) < 2:
+                continue
+            # The patch is the first top-level directory named like one; dragontail also has a bare img/.
+            if version is None and VERSION_RE.fullmatch(parts[0]):
+                version = parts[0]
+            if version is None or '..' in parts or (parts[0] != version and parts[1:] != ['images.pack']):
+                continue
+            if parts[0] == version and parts[1:] == ['.complete']:
+                continue  # build_offline marks the patch complete once everything is in place
+            if parts[1] == 'data' and len(parts) == 4:
+                language, file_name = parts[2], parts[3]
+                data_type = os.path.splitext(file_name)[0]
+                if language in languages and data_type in DATA_TYPES:
+                    data = json.load(archive.extractfile(member))['data']
+                    write_atomic(os.path.join(cache_dir, version, language, file_name), json.dumps(data).encode())
+            elif parts[1] == 'img' and len(parts) == 4:
+                if parts[2] in ICON_KINDS and parts[3].endswith('.png'):
+                    transcoded[parts[3]] = viewer.image_pipeline.submit(archive.extractfile(member).read())
+            elif parts[1:] in (['images.pack'], ['images.index.json']):
+                write_atomic(os.path.join(cache_dir, version, '_import', 'packs', parts[0], parts[1]), archive.extractfile(member).read())
+            elif parts[1] != 'img' and parts[1] != 'data' and VERSION_RE.fullmatch(parts[0]):
+                # Our own export: already in the cache layout.
+                write_atomic(os.path.join(cache_dir, *parts), archive.extractfile(member).read())
+
+    if version is None:
+        raise ValueError(f"{bundle_path} is empty")
+    staging_dir = os.path.join(cache_dir, version, '_import')
+    for name, future in transcoded.items():
+        viewer.image_pipeline.save(future.result(), os.path.join(staging_dir, name))
+    packs_dir = os.path.join(staging_dir, 'packs')
+    unpack_export(packs_dir, version, staging_dir)
+    shutil.rmtree(packs_dir, ignore_errors=True)
+
+    viewer.build_offline(version, [staging_dir], languages)
+    if os.path.isdir(staging_dir) and not os.listdir(staging_dir):
+        os.rmdir(staging_dir)
+    return version
+
+
+def unpack_export(packs_dir, version, image_dir):
+    """Write every icon the exported index of a patch lists as a loose file in image_dir."""
+    index_path = os.path.join(packs_dir, version, 'images.index.json')
+    if not os.path.exists(index_path):
+        return
+    with open(index_path) as file:
+        index = json.load(file)
+    packs = {}
+    try:
+        for name, (pack_version, offset, length, _) in index.items():
+            if os.path.basename(name) != name or not VERSION_RE.fullmatch(pack_version):
+                continue
+            if pack_version not in packs:
+                packs[pack_version] = open(os.path.join(packs_dir, pack_version, 'images.pack'), 'rb')
+            packs[pack_version].seek(offset)
+            write_atomic(os.path.join(image_dir, name), packs[pack_version].read(length))
+    finally:
+        for pack in packs.values():
+            pack.close()
+
+
+def export_bundle(viewer, version, bundle_path):
+    """Write cache/<version>/ (datasets, compact files, icon pack, sprites) as one .tgz.
+
+    Older packs the patch's icon index points into are included, so the bundle is self-contained.
+    """
+    version_dir = os.path.join(viewer.cache_dir, version)
+    if not os.path.exists(os.path.join(version_dir, '.complete')):
+        raise ValueError(f"{version} is not fully cached; warm it first")
+    pack_versions = {entry[0] for entry in viewer.image_store.index(version).values()} - {version}
+    with tarfile.open(bundle_path, 'w|gz') as archive:
+        archive.add(version_dir, arcname=version, filter=lambda info: None if info.name.endswith('.tmp') else info)
+        for pack_version in sorted(pack_versions):
+            archive.add(viewer.image_store.pack_path(pack_version), arcname=f"{pack_version}/images.pack")
@@ -0,0 +1,159 @@
+import base64
+import gzip
+import json
+
+from descriptions import clean_text
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def champion_records(champions_data, descriptions):
+    """API records of every champion, with plain-text spell descriptions."""
+    for champion_id, champion in champions_data.items():
+        yield {
+            'id': champion_id,
+            'key': champion['key'],
+            'name': champion['name'],
+            'tags': list(champion.get('tags', ())),
+            'image': champion['image']['full'],
+            'spells': [{'id': spell['id'], 'name': spell['name'], 'description': description}
+                       for spell, description in zip(champion['spells'], descriptions[champion_id])],
+            'skins': [skin['name'] for skin in champion['skins']],
+        }
+
+
+def item_records(items_data, descriptions):
+    """API records of every item, with plain-text names and descriptions."""
+    for item_id, item in items_data.items():
+        yield {
+            'id': item_id,
+            'name': clean_text(item['name']),
+            'description': descriptions[item_id],
+            'image': item['image']['full'],
+            'gold': dict(item['gold']),
+            'tags': list(item.get('tags', ())),
+            'maps': [map_id for map_id, enabled in item['maps'].items() if enabled],
+            'into': list(item.get('into', ())),
+            'from': list(item.get('from', ())),
+            'stats': dict(item.get('stats', {})),
+        }
+
+
+SORT_KEYS = {
+    'id': lambda record: record['id'],
+    'name': lambda record: record['name'].lower(),
+    'tag': lambda record: (record['tags'][0] if record['tags'] else '', record['name'].lower()),
+    'gold': lambda record: (record['gold']['total'], record['name'].lower()),
+}
+
+
+def encode_variants(body):
+    """{content coding: bytes} of a serialized page, compressed once when it enters the cache."""
+    data = body.encode('utf-8')
+    variants = {'identity': data}
+    if len(data) > 1024:
+        variants['gzip'] = gzip.compress(data, 6)
+        if brotli is not None:
+            variants['br'] = brotli.compress(data, quality=5)
+    return variants
+
+
+class CatalogError(ValueError):
+    pass
+
+
+class Catalog:
+    """One dataset as pre-serialized JSON fragments, for /api/champions and /api/items.
+
+    Every field of every record is serialized once when the catalog is built, so a page is
+    assembled by joining strings whatever `fields` asks for. Sort orders are precomputed
+    position tuples and tag/map filters are int bitmasks over positions, as in ItemIndex.
+    Cursors are offsets into a sort order and are only valid for the patch that issued them.
+    """
+
+    def __init__(self, version, records, sorts):
+        records = list(records)
+        self.version = version
+        self.fields = tuple(records[0]) if records else ('id',)
+        self.fragments = tuple(
+            {field: f'{json.dumps(field)}:{json.dumps(value, ensure_ascii=False, separators=(",", ":"))}' for field, value in record.items()}
+            for record in records
+        )
+        self.orders = {sort: tuple(sorted(range(len(records)), key=lambda position: SORT_KEYS[sort](records[position]))) for sort in sorts}
+        self.all = (1 << len(records)) - 1
+        self.tags = {}
+        self.maps = {}
+        for position, record in enumerate(records):
+            bit = 1 << position
+            for tag in record['tags']:
+                self.tags[tag.lower()] = self.tags.get(tag.lower(), 0) | bit
+            for map_id in record.get('maps', ()):
+                self.maps[map_id] = self.maps.get(map_id, 0) | bit
+
+    def __len__(self):
+        return len(self.fragments)
+
+    def encode_cursor(self, sort, offset):
+        return base64.urlsafe_b64encode(f"{self.version}|{sort}|{offset}".encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor, sort):
+        try:
+            version, cursor_sort, offset = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode().split('|')
+            offset = int(offset)
+        except ValueError:
+            raise CatalogError("malformed cursor")
+        if version != self.version:
+            raise CatalogError("cursor belongs to another patch, start again without it")
+        if cursor_sort != sort:
+            raise CatalogError("cursor was issued for another sort order")
+        if not 0 <= offset <= len(self.fragments):
+            raise CatalogError("cursor offset out of range")
+        return offset
+
+    def mask(self, tags=(), maps=()):
+        """Positions carrying every tag in `tags` and available on any map in `maps`."""
+        mask = self.all
+        for tag in tags:
+            mask &= self.tags.get(tag.lower(), 0)
+        if maps:
+            map_mask = 0
+            for map_id in maps:
+                map_mask |= self.maps.get(map_id, 0)
+            mask &= map_mask
+        return mask
+
+    def page(self, fields=None, sort='name', tags=(), maps=(), cursor=None, limit=50):
+        """Serialized {"version", "total", "data", "next"} page of the records matching the filters."""
+        fields = tuple(fields) if fields else self.fields
+        unknown = [field for field in fields if field not in self.fields]
+        if unknown:
+            raise CatalogError(f"unknown fields: {', '.join(unknown)}")
+        descending = sort.startswith('-')
+        sort_key = sort.lstrip('-')
+        if sort_key not in self.orders:
+            raise CatalogError(f"sort must be one of: {', '.join(sorted(self.orders))} (prefix - to reverse)")
+        order = self.orders[sort_key]
+        if descending:
+            order = order[::-1]
+        offset = self.decode_cursor(cursor, sort) if cursor else 0
+
+        mask = self.mask(tags, maps)
+        total = bin(mask).count('1')
+        chunks = []
+        next_cursor = None
+        for index in range(offset, len(order)):
+            position = order[index]
+            if not mask >> position & 1:
+                continue
+            if len(chunks) == limit:
+                next_cursor = self.encode_cursor(sort, index)
+                break
+            fragments = self.fragments[position]
+            chunks.append('{' + ','.join(fragments[field] for field in fields) + '}')
+        return (
+            f'{{"version":{json.dumps(self.version)},"total":{total},'
+            f'"data":[{",".join(chunks)}],"next":{json.dumps(next_cursor)}}}'
+        )
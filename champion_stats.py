@@ -0,0 +1,80 @@
+import numpy as np
+
+# (name, base key, per-level key) of every championFull.json stat; None when the stat does not grow.
+STATS = (
+    ("hp", "hp", "hpperlevel"),
+    ("mp", "mp", "mpperlevel"),
+    ("armor", "armor", "armorperlevel"),
+    ("spellblock", "spellblock", "spellblockperlevel"),
+    ("attackdamage", "attackdamage", "attackdamageperlevel"),
+    ("attackspeed", "attackspeed", "attackspeedperlevel"),
+    ("hpregen", "hpregen", "hpregenperlevel"),
+    ("mpregen", "mpregen", "mpregenperlevel"),
+    ("crit", "crit", "critperlevel"),
+    ("movespeed", "movespeed", None),
+    ("attackrange", "attackrange", None),
+)
+STAT_NAMES = tuple(name for name, _, _ in STATS)
+MAX_LEVEL = 18
+
+
+def growth_factor(level):
+    """Share of the per-level value gained by `level` (League's non-linear growth curve)."""
+    return (level - 1) * (0.7025 + 0.0175 * (level - 1))
+
+
+def stats_at_levels(base, growth):
+    """(champions, 18, stats) array of every stat at levels 1-18 in one broadcast.
+
+    growth holds absolute per-level values; attack speed growth is a percentage of the base
+    and has to be scaled before it gets here (see ChampionStats).
+    """
+    factors = growth_factor(np.arange(1, MAX_LEVEL + 1, dtype=np.float64))
+    return base[:, None, :] + growth[:, None, :] * factors[None, :, None]
+
+
+class ChampionStats:
+    """Champions x stats matrices of one patch, with every level precomputed.
+
+    `base` and `growth` are (champions, stats) float arrays in STATS order, rows in `ids` order.
+    `values[c, level - 1, s]` is stat s of champion c at that level.
+    """
+
+    def __init__(self, champions_data):
+        self.ids = tuple(sorted(champions_data))
+        self.by_id = {champion_id: row for row, champion_id in enumerate(self.ids)}
+        self.names = tuple(champions_data[champion_id]['name'] for champion_id in self.ids)
+        self.columns = {name: column for column, name in enumerate(STAT_NAMES)}
+        self.base = np.array([[champions_data[champion_id]['stats'].get(key, 0.0) for _, key, _ in STATS] for champion_id in self.ids], dtype=np.float64).reshape(-1, len(STATS))
+        self.growth = np.array([[champions_data[champion_id]['stats'].get(key, 0.0) if key else 0.0 for _, _, key in STATS] for champion_id in self.ids], dtype=np.float64).reshape(-1, len(STATS))
+        attack_speed = self.columns["attackspeed"]
+        self.growth[:, attack_speed] *= self.base[:, attack_speed] / 100
+        self.values = stats_at_levels(self.base, self.growth)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def top(self, stat, level, k=10, ascending=False):
+        """[(id, name, value)] of the k champions with the highest (or lowest) stat at a level."""
+        values = self.values[:, level - 1, self.columns[stat]]
+        k = min(k, len(values))
+        if k <= 0:
+            return []
+        keys = values if ascending else -values
+        rows = np.argpartition(keys, k - 1)[:k]
+        rows = rows[np.argsort(keys[rows], kind='stable')]
+        return [(self.ids[row], self.names[row], round(float(values[row]), 3)) for row in rows]
+
+    def levels(self, champion_id, stats=STAT_NAMES):
+        """{stat: [value at level 1, ..., value at level 18]} of one champion, or None."""
+        row = self.by_id.get(champion_id)
+        if row is None:
+            return None
+        columns = [self.columns[stat] for stat in stats]
+        table = np.round(self.values[row][:, columns], 3)
+        return {stat: table[:, index].tolist() for index, stat in enumerate(stats)}
+
+    def at_level(self, champion_id, level):
+        """[(stat, value)] of one champion at a level, in STATS order."""
+        values = self.values[self.by_id[champion_id], level - 1]
+        return [(stat, round(float(value), 3)) for stat, value in zip(STAT_NAMES, values)]
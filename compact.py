@@ -0,0 +1,86 @@
+import marshal
+import os
+import sys
+import threading
+
+# Bump when a projection below changes, so stale .compact files are rebuilt from the JSON.
+FORMAT_VERSION = 4
+
+
+def project_champion(champion):
+    return {
+        'id': champion['id'],
+        'key': champion['key'],
+        'name': champion['name'],
+        'image': {'full': champion['image']['full']},
+        'tags': list(champion.get('tags', ())),
+        'stats': dict(champion.get('stats', {})),
+        'spells': [{'id': spell['id'], 'name': spell['name'], 'description': spell['description']} for spell in champion['spells']],
+        'skins': [{'name': skin['name']} for skin in champion['skins']],
+    }
+
+
+def project_item(item):
+    return {
+        'name': item['name'],
+        'description': item['description'],
+        'plaintext': item.get('plaintext', ''),
+        'image': {'full': item['image']['full']},
+        'gold': {'total': item['gold']['total'], 'sell': item['gold']['sell']},
+        'maps': dict(item.get('maps', {})),
+        'tags': list(item.get('tags', ())),
+        'into': list(item.get('into', ())),
+        'from': list(item.get('from', ())),
+        'stats': dict(item.get('stats', {})),
+    }
+
+
+PROJECTIONS = {
+    "championFull": project_champion,
+    "item": project_item,
+}
+
+
+def intern_strings(value):
+    """Intern every dict key and short string so repeated values share one object (and one marshal ref)."""
+    if isinstance(value, dict):
+        return {sys.intern(key): intern_strings(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [intern_strings(item) for item in value]
+    if isinstance(value, str) and len(value) <= 64:
+        return sys.intern(value)
+    return value
+
+
+def project(data_type, data):
+    """Keep only the fields the web app reads; datasets without a projection are returned as-is."""
+    projection = PROJECTIONS.get(data_type)
+    if projection is None:
+        return data
+    return intern_strings({entry_id: projection(entry) for entry_id, entry in data.items()})
+
+
+def compact_path(json_path):
+    return os.path.splitext(json_path)[0] + ".compact"
+
+
+def save_compact(path, data):
+    # Unique per writer: two processes or threads saving the same dataset must not share a temp file.
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'wb') as file:
+        marshal.dump((FORMAT_VERSION, sys.version_info[:2], data), file)
+    os.replace(tmp_path, path)
+
+
+def load_compact(path):
+    """Return the projected dataset, or None if the file is missing or was written by another format/Python."""
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'rb') as file:
+            format_version, python_version, data = marshal.load(file)
+    except (EOFError, ValueError, TypeError):
+        return None
+    if format_version != FORMAT_VERSION or tuple(python_version) != sys.version_info[:2]:
+        return None
+    return data
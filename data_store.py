@@ -0,0 +1,59 @@
+from types import MappingProxyType
+
+from single_flight import SingleFlight
+
+
+class DataStore:
+    """Process-wide in-memory cache of Data Dragon datasets keyed by (version, language, data_type)."""
+
+    def __init__(self):
+        self._datasets = {}
+        self._flights = SingleFlight()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, version, language, data_type, loader):
+        """Return the cached snapshot, calling loader() once on a miss. Loaded dicts are wrapped read-only.
+
+        Concurrent misses for the same key wait for a single load; other keys are not blocked.
+        """
+        key = (version, language, data_type)
+        snapshot = self._datasets.get(key)
+        if snapshot is not None:
+            self.hits += 1
+            return snapshot
+
+        return self._flights.do(key, lambda: self._load(key, loader))
+
+    def _load(self, key, loader):
+        snapshot = self._datasets.get(key)
+        if snapshot is not None:
+            self.hits += 1
+            return snapshot
+        self.misses += 1
+        snapshot = loader()
+        if isinstance(snapshot, dict):
+            snapshot = MappingProxyType(snapshot)
+        self._datasets[key] = snapshot
+        return snapshot
+
+    def invalidate(self, version=None, language=None, data_type=None):
+        """Drop every dataset matching the given filters; no filters clears everything."""
+        for key in list(self._datasets):
+            if version is not None and key[0] != version:
+                continue
+            if language is not None and key[1] != language:
+                continue
+            if data_type is not None and key[2] != data_type:
+                continue
+            self._datasets.pop(key, None)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0,
+            "datasets": len(self._datasets),
+            "coalesced": self._flights.shared,
+        }
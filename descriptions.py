@@ -0,0 +1,39 @@
+import re
+
+BR_RE = re.compile(r'<br\s*/?>', re.IGNORECASE)
+TAG_RE = re.compile(r'<[^>]*>')
+MARKUP_RE = re.compile(r'<(/?)([A-Za-z]+)[^>]*>|<[^>]*>')
+
+
+def clean_text(text, keep=()):
+    """Turn Data Dragon markup into plain text: <br> becomes a newline and other tags are dropped.
+
+    Tags named in `keep` (lower case, e.g. ('stats', 'passive')) survive as [stats] ... [/stats] tokens.
+    """
+    if '<' not in text:
+        return text
+    if not keep:
+        return TAG_RE.sub('', BR_RE.sub('\n', text))
+
+    def token(match):
+        name = (match.group(2) or '').lower()
+        if name == 'br':
+            return '\n'
+        if name in keep:
+            return f"[{match.group(1)}{name}]"
+        return ''
+
+    return MARKUP_RE.sub(token, text)
+
+
+def champion_descriptions(champions_data):
+    """{champion id: (spell description, ...)} with markup stripped, in spell order."""
+    return {
+        champion_id: tuple(clean_text(spell['description']) for spell in champion['spells'])
+        for champion_id, champion in champions_data.items()
+    }
+
+
+def item_descriptions(items_data):
+    """{item id: description} with markup stripped."""
+    return {item_id: clean_text(item['description']) for item_id, item in items_data.items()}
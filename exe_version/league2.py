@@ -3,8 +3,11 @@ from tkinter import ttk, messagebox
 from PIL import Image, ImageTk
 import os
 import io
-import requests
-import json
+import sys
+
+# Datasets, icons and the cache layout come from the shared core next to app.py.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import league_core
 
 class YourAppClass:
     def __init__(self):
@@ -22,7 +25,7 @@ class YourAppClass:
         self.map_11_var = tk.BooleanVar(value=True)
 
         self.cache_dir = "cache"
-        self.image_cache_dir = os.path.join(self.cache_dir, "images")
+        self.core = league_core.DataDragon(self.cache_dir, image_workers=0)
         self.champion_images = {}
         self.champions = {}
 
@@ -57,12 +60,10 @@ class YourAppClass:
 
     def load_images_from_cache(self):
         """Load champion images from cache to avoid fetching each time."""
-        if not os.path.exists(self.image_cache_dir):
-            os.makedirs(self.image_cache_dir)
         for champion_id, champion in self.champions.items():
-            image_path = os.path.join(self.image_cache_dir, f"{champion_id}.png")
-            if os.path.exists(image_path):
-                img = Image.open(image_path).resize((64, 64))  # Resize for display
+            data = self.core.read_icon(self.latest_version, "pl_PL", f"{champion_id}.png")
+            if data is not None:
+                img = Image.open(io.BytesIO(data)).resize((64, 64))  # Resize for display
                 self.champion_images[champion["name"]] = ImageTk.PhotoImage(img)
 
     def update_champion_grid(self):
@@ -72,25 +73,19 @@ class YourAppClass:
 
         # Create a grid of images
         for index, (champion_id, champion) in enumerate(self.champions.items()):
-            img = self.fetch_image(f"https://ddragon.leagueoflegends.com/cdn/{self.latest_version}/img/champion/{champion_id}.png", f"{champion_id}.png")
+            img = self.fetch_image("champion", champion_id)
             self.champion_images[champion["name"]] = ImageTk.PhotoImage(img)
 
             # Create a button for each image
             btn = tk.Button(self.frame, image=self.champion_images[champion["name"]], command=lambda champ=champion: self.show_champion_details(champ))
             btn.grid(row=index // 10, column=index % 10, padx=5, pady=5)  # Arrange in a grid of 10 per row
 
-    def fetch_image(self, image_url, image_name):
-        """Fetch an image from the URL and cache it locally."""
-        image_path = os.path.join(self.image_cache_dir, image_name)
-
-        if os.path.exists(image_path):
-            return Image.open(image_path)  # Load from cache
-
-        # If not cached, download it
-        img_data = requests.get(image_url).content
-        img = Image.open(io.BytesIO(img_data)).resize((64, 64))
-        img.save(image_path)  # Save to cache
-        return img
+    def fetch_image(self, kind, image_id):
+        """Fetch an image through the shared cache (downloaded once per patch)."""
+        data = self.core.icon(self.latest_version, "pl_PL", kind, image_id)
+        if data is None:
+            return Image.new('RGB', (64, 64), color='gray')
+        return Image.open(io.BytesIO(data)).resize((64, 64))
 
     def show_champion_details(self, champion_data):
         """Display champion details in a new window."""
@@ -101,21 +96,18 @@ class YourAppClass:
 
     def get_latest_version(self):
         """Fetch the latest version of the game."""
-        url = "https://ddragon.leagueoflegends.com/api/versions.json"
-        response = requests.get(url)
-        if response.status_code == 200:
-            return response.json()[0]  # Return the latest version
-        else:
+        version = self.core.latest_version(fallback=None)
+        if version is None:
             messagebox.showerror("Error", "Failed to fetch the latest version!")
-            return "12.6.1"  # Default value in case of error
+            return league_core.FALLBACK_VERSION  # Default value in case of error
+        return version
 
     def fetch_data(self, language="pl_PL", data_type="championFull"):
         """Fetch data for champions or items."""
-        url = f"https://ddragon.leagueoflegends.com/cdn/{self.latest_version}/data/{language}/{data_type}.json"
-        response = requests.get(url)
-        if response.status_code == 200:
-            return response.json()["data"]
-        else:
+        try:
+            return self.core.load_data(self.latest_version, language, data_type)
+        except Exception as e:
+            print(f"Error fetching {data_type}: {e}")
             messagebox.showerror("Error", "Failed to fetch data!")
             return {}
 
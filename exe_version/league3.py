@@ -3,8 +3,11 @@ from tkinter import ttk, messagebox
 from PIL import Image, ImageTk
 import os
 import io
-import requests
-import json
+import sys
+
+# Datasets, icons and the cache layout come from the shared core next to app.py.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import league_core
 
 
 class ItemViewer:
@@ -12,7 +15,7 @@ class ItemViewer:
         self.root = tk.Tk()
         self.root.title("League of Legends - Item Viewer")
         self.cache_dir = "cache"
-        self.image_cache_dir = os.path.join(self.cache_dir, "images")
+        self.core = league_core.DataDragon(self.cache_dir, image_workers=0)
         self.item_images = {}
         self.items = {}
         self.tags = set()
@@ -85,12 +88,10 @@ class ItemViewer:
 
     def load_images_from_cache(self):
         """Load item images from cache to avoid fetching each time."""
-        if not os.path.exists(self.image_cache_dir):
-            os.makedirs(self.image_cache_dir)
         for item_id, item in self.items.items():
-            image_path = os.path.join(self.image_cache_dir, f"{item_id}.png")
-            if os.path.exists(image_path):
-                img = Image.open(image_path).resize((72, 72))  # Resize for display
+            data = self.core.read_icon(self.latest_version, "pl_PL", f"{item_id}.png")
+            if data is not None:
+                img = Image.open(io.BytesIO(data)).resize((72, 72))  # Resize for display
                 self.item_images[item["name"]] = ImageTk.PhotoImage(img)
 
     def update_item_grid(self):
@@ -111,7 +112,7 @@ class ItemViewer:
 
         # Create a grid of images for unique items
         for index, (item_name, item) in enumerate(sorted_unique_items):
-            img = self.fetch_image(f"https://ddragon.leagueoflegends.com/cdn/{self.latest_version}/img/item/{item['id']}.png", f"{item['id']}.png")
+            img = self.fetch_image("item", item['id'])
             if img:
                 self.item_images[item["name"]] = ImageTk.PhotoImage(img)
 
@@ -125,18 +126,12 @@ class ItemViewer:
 
 
 
-    def fetch_image(self, image_url, image_name):
-        image_path = os.path.join(self.image_cache_dir, image_name)
-        if os.path.exists(image_path):
-            return Image.open(image_path)
-        try:
-            img_data = requests.get(image_url).content
-            img = Image.open(io.BytesIO(img_data)).resize((32, 32))
-            img.save(image_path)
-            return img
-        except Exception as e:
-            print(f"Error fetching image from URL: {image_url}, error: {e}")
+    def fetch_image(self, kind, image_id):
+        data = self.core.icon(self.latest_version, "pl_PL", kind, image_id)
+        if data is None:
+            print(f"Error fetching image: {image_id}")
             return Image.new('RGB', (32, 32), color='gray')
+        return Image.open(io.BytesIO(data))
 
 
     def is_item_visible(self, item):
@@ -153,21 +148,18 @@ class ItemViewer:
 
     def get_latest_version(self):
         """Fetch the latest version of the game."""
-        url = "https://ddragon.leagueoflegends.com/api/versions.json"
-        response = requests.get(url)
-        if response.status_code == 200:
-            return response.json()[0]  # Return the latest version
-        else:
+        version = self.core.latest_version(fallback=None)
+        if version is None:
             messagebox.showerror("Error", "Failed to fetch the latest version!")
-            return "12.6.1"  # Default value in case of error
+            return league_core.FALLBACK_VERSION  # Default value in case of error
+        return version
 
     def fetch_data(self, language="pl_PL", data_type="item"):
         """Fetch data for items."""
-        url = f"https://ddragon.leagueoflegends.com/cdn/{self.latest_version}/data/{language}/{data_type}.json"
-        response = requests.get(url)
-        if response.status_code == 200:
-            return response.json()["data"]
-        else:
+        try:
+            return self.core.load_data(self.latest_version, language, data_type)
+        except Exception as e:
+            print(f"Error fetching {data_type}: {e}")
             messagebox.showerror("Error", "Failed to fetch data!")
             return {}
 
@@ -1,23 +1,40 @@
-import requests
-import json
+import time
+
+STARTED = time.perf_counter()
+
 import tkinter as tk
 from tkinter import ttk, messagebox
 from PIL import Image, ImageTk
 import os
 import io
+import sys
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from virtual_grid import VirtualGrid
+
+# Datasets, icons and the cache layout come from the shared core next to app.py.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import league_core
+
 
 class LeagueViewer:
     def __init__(self, root):
+        self.root = root
         self.cache_dir = "cache"
-        self.champion_images = {}
-        self.item_images = {}
-        self.image_cache_dir = os.path.join(self.cache_dir, "images")
-        self.version_dir = os.path.join(self.cache_dir)
+        # Icons are transcoded on the fetching thread; no process pool for a desktop app.
+        self.core = league_core.DataDragon(self.cache_dir, image_workers=0)
+        self.photo_images = {}
+        self.pending_images = set()
+        # Workers only download and decode; widgets and PhotoImages are made on the Tk thread in poll_results.
+        self.results = queue.Queue()
+        self.workers = ThreadPoolExecutor(max_workers=8)
         self.language_var = tk.StringVar(value="pl_PL")
         self.current_language = "pl_PL"
-        self.latest_version = self.get_latest_version()
-        self.version_dir = os.path.join(self.cache_dir, self.latest_version)
-        self.data_dir = os.path.join(self.version_dir, self.current_language)
+        self.latest_version = None
+        self.champions = {}
+        self.items = {}
+        self.item_order = []
+        self.search_index = None
         self.tags = set()
         self.search_var = {}
         self.tag_vars = {}
@@ -29,58 +46,102 @@ class LeagueViewer:
             "skins": {"pl_PL": "Skórki", "en_US": "Skins"},
             "error_message": {"pl_PL": "Nie udało się pobrać danych!", "en_US": "Failed to fetch data!"},
             "champions_tab": {"pl_PL": "Bohaterowie", "en_US": "Champions"},
-            "items_tab": {"pl_PL": "Przedmioty", "en_US": "Items"}
+            "items_tab": {"pl_PL": "Przedmioty", "en_US": "Items"},
+            "loading": {"pl_PL": "Ładowanie danych...", "en_US": "Loading data..."}
         }
-        self.create_cache_dirs()
-        self.champions = self.load_or_fetch_data("championFull")
-        self.items = self.load_or_fetch_data("item")
+        self.placeholder = tk.PhotoImage(width=32, height=32)
+        self.placeholder.put("gray", to=(0, 0, 32, 32))
         self.setup_gui(root)
+        self.load_language(self.current_language)
+        root.after(0, self.report_first_paint)
+        root.after(50, self.poll_results)
+
+    def report_first_paint(self):
+        self.root.update_idletasks()
+        print(f"First paint after {(time.perf_counter() - STARTED) * 1000:.0f}ms")
+
+    def load_language(self, language):
+        """Load the version and both datasets of a language on a worker; poll_results shows them."""
+        self.status_label.config(text=self.language_texts["loading"][language])
+        self.status_label.pack(pady=5)
+        version = self.latest_version
+
+        def work():
+            try:
+                latest_version = version or self.core.latest_version()
+                champions = self.core.load_data(latest_version, language, "championFull")
+                items = self.core.load_data(latest_version, language, "item")
+                search_index = league_core.SearchIndex(league_core.champion_entries(champions))
+                self.results.put(("data", latest_version, language, champions, items, search_index))
+            except Exception as e:
+                self.results.put(("error", language, e))
+
+        self.workers.submit(work)
+
+    def poll_results(self):
+        """Apply everything the workers finished since the last poll, then check again in 50ms."""
+        try:
+            while True:
+                result = self.results.get_nowait()
+                if result[0] == "data":
+                    self.show_data(*result[1:])
+                elif result[0] == "image":
+                    _, grid, image_id, img = result
+                    self.pending_images.discard(f"{image_id}.png")
+                    photo = self.photo_images[f"{image_id}.png"] = ImageTk.PhotoImage(img)
+                    grid.set_image(image_id, photo)
+                elif result[0] == "error" and result[1] == self.current_language:
+                    print(f"Error loading data: {result[2]}")
+                    self.status_label.pack_forget()
+                    messagebox.showerror(message=self.language_texts["error_message"][self.current_language])
+        except queue.Empty:
+            pass
+        self.root.after(50, self.poll_results)
+
+    def show_data(self, version, language, champions, items, search_index):
+        if language != self.current_language:
+            return  # the user switched language again before this one finished loading
+        self.latest_version = version
+        self.champions = champions
+        self.items = items
+        self.search_index = search_index
+        self.item_order = self.shop_order(items)
+        if not self.tag_vars:
+            self.create_tag_checkboxes(self.tag_frame)
+        self.status_label.pack_forget()
         self.update_champion_grid()
         self.update_item_list()
+        print(f"Data for {language} shown after {(time.perf_counter() - STARTED) * 1000:.0f}ms")
 
-    def create_cache_dirs(self):
-        os.makedirs(self.image_cache_dir, exist_ok=True)
-
-    def get_latest_version(self):
-        try:
-            url = "https://ddragon.leagueoflegends.com/api/versions.json"
-            return requests.get(url).json()[0]
-        except:
-            return "12.6.1"
-
-    def save_to_cache(self, data_type, data):
-        os.makedirs(self.data_dir, exist_ok=True)
-        with open(os.path.join(self.data_dir, f"{data_type}.json"), "w") as file:
-            json.dump(data, file)
-
-    def load_from_cache(self, data_type):
-        path = os.path.join(self.data_dir, f"{data_type}.json")
-        if os.path.exists(path):
-            with open(path, "r") as file:
-                return json.load(file)
-        return None
-
-    def load_or_fetch_data(self, data_type):
-        data = self.load_from_cache(data_type)
-        if not data:
-            url = f"https://ddragon.leagueoflegends.com/cdn/{self.latest_version}/data/{self.current_language}/{data_type}.json"
-            response = requests.get(url)
-            data = response.json()["data"]
-            self.save_to_cache(data_type, data)
-        return data
-
-    def fetch_image(self, image_url, image_name):
-        image_path = os.path.join(self.image_cache_dir, image_name)
-        if os.path.exists(image_path):
-            return Image.open(image_path)
+    def fetch_image(self, kind, image_id, version, language):
+        """PIL image of a cached or freshly downloaded icon, gray when it cannot be fetched."""
         try:
-            img_data = requests.get(image_url).content
-            img = Image.open(io.BytesIO(img_data)).resize((32, 32))
-            img.save(image_path)
-            return img
+            data = self.core.icon(version, language, kind, image_id)
+            if data is not None:
+                return Image.open(io.BytesIO(data))
         except Exception as e:
-            print(f"Error fetching image from URL: {image_url}, error: {e}")
-            return Image.new('RGB', (32, 32), color='gray')
+            print(f"Error loading image {image_id}, error: {e}")
+        return Image.new('RGB', (32, 32), color='gray')
+
+    def photo_image(self, kind, image_id, grid):
+        """PhotoImage of an icon, created once and shared by every grid and language.
+
+        Icons not loaded yet show the placeholder; a worker fetches them and poll_results
+        swaps them into the grid.
+        """
+        image_name = f"{image_id}.png"
+        photo = self.photo_images.get(image_name)
+        if photo is not None:
+            return photo
+        if image_name not in self.pending_images:
+            self.pending_images.add(image_name)
+            version, language = self.latest_version, self.current_language
+            self.workers.submit(lambda: self.results.put(("image", grid, image_id, self.fetch_image(kind, image_id, version, language))))
+        return self.placeholder
+
+    def shop_order(self, items):
+        """Item ids cheapest first, sorted once per dataset; filtering only picks from this list."""
+        return sorted(items, key=lambda item_id: items[item_id]['gold']['total'])
 
     def setup_gui(self, root):
         root.title("League of Legends Viewer")
@@ -93,6 +154,8 @@ class LeagueViewer:
         ttk.Radiobutton(lang_frame, text="Polski", variable=self.language_var, value="pl_PL", command=self.update_language).pack(side=tk.LEFT)
         ttk.Radiobutton(lang_frame, text="English", variable=self.language_var, value="en_US", command=self.update_language).pack(side=tk.LEFT)
 
+        self.status_label = ttk.Label(root)
+
         # Tab Control
         self.tab_control = ttk.Notebook(root)
         self.champions_tab = ttk.Frame(self.tab_control)
@@ -109,86 +172,40 @@ class LeagueViewer:
         search_entry.pack(pady=5)
         search_entry.bind("<KeyRelease>", self.filter_champions)  # For filtering champions
 
-        # Champion grid with scrollable frame
-        champion_canvas = tk.Canvas(self.champions_tab)
-        champion_canvas.pack(side=tk.LEFT, fill="both", expand=True)
-
-        self.champion_grid_frame = tk.Frame(champion_canvas)
-        champion_scrollbar = ttk.Scrollbar(self.champions_tab, orient="vertical", command=champion_canvas.yview)
-        champion_scrollbar.pack(side=tk.RIGHT, fill="y")
-
-        champion_canvas.configure(yscrollcommand=champion_scrollbar.set)
-        champion_canvas.create_window((0, 0), window=self.champion_grid_frame, anchor="nw")
-
-        self.champion_grid_frame.bind("<Configure>", lambda e: champion_canvas.configure(scrollregion=champion_canvas.bbox("all")))
-
-        # Listbox for items with scrollable frame
-        item_canvas = tk.Canvas(self.items_tab)
-        item_canvas.pack(side=tk.LEFT, fill="both", expand=True)
-
-        self.item_list_frame = tk.Frame(item_canvas)
-        item_scrollbar = ttk.Scrollbar(self.items_tab, orient="vertical", command=item_canvas.yview)
-        item_scrollbar.pack(side=tk.RIGHT, fill="y")
-
-        item_canvas.configure(yscrollcommand=item_scrollbar.set)
-        item_canvas.create_window((0, 0), window=self.item_list_frame, anchor="nw")
+        # Only the visible rows of the grids have widgets, see virtual_grid.py
+        self.champion_grid = VirtualGrid(self.champions_tab, lambda champion_id: self.champions[champion_id]["name"],
+                                         lambda champion_id: self.photo_image("champion", champion_id, self.champion_grid),
+                                         lambda champion_id: self.show_champion_details(self.champions[champion_id]))
+        self.champion_grid.frame.pack(fill="both", expand=True)
 
-        self.item_list_frame.bind("<Configure>", lambda e: item_canvas.configure(scrollregion=item_canvas.bbox("all")))
+        # Tag checkboxes above the item grid, filled in once the items are loaded
+        self.tag_frame = tk.Frame(self.items_tab)
+        self.tag_frame.pack(pady=5)
 
-        # Bind mouse wheel scrolling to canvas
-        item_canvas.bind_all("<MouseWheel>", self.on_mouse_wheel)
-        champion_canvas.bind_all("<MouseWheel>", self.on_mouse_wheel)
-
-        # Other GUI elements like tag checkboxes for items
-        self.create_tag_checkboxes(self.item_list_frame)
+        self.item_grid = VirtualGrid(self.items_tab, lambda item_id: self.items[item_id]["name"],
+                                     lambda item_id: self.photo_image("item", item_id, self.item_grid),
+                                     lambda item_id: self.show_item_details(self.items[item_id]))
+        self.item_grid.frame.pack(fill="both", expand=True)
 
     def update_champion_grid(self):
-        """Update the grid of champions displayed as images based on the search filter."""
-        # Clear existing widgets in the frame if any
-        for widget in self.champions_tab.winfo_children():
-            widget.destroy()  # Clear existing images
-
-        # Get the current search term
-        search_term = self.search_var.get().lower()
-        filtered_champions = {champion_id: champion for champion_id, champion in self.champions.items() if search_term in champion["name"].lower()}
-
-        # Create a grid of images for filtered champions
-        for index, (champion_id, champion) in enumerate(filtered_champions.items()):
-            img = self.fetch_image(f"https://ddragon.leagueoflegends.com/cdn/{self.latest_version}/img/champion/{champion_id}.png", f"{champion_id}.png")
-            self.champion_images[champion["name"]] = ImageTk.PhotoImage(img)
-
-            # Create a button for each image
-            name_label = tk.Label(self.champions_tab, text=champion["name"], wraplength=72)
-            name_label.grid(row=index // 20, column=(index % 20), padx=3, pady=(0, 20))
-            btn = tk.Button(self.champions_tab, image=self.champion_images[champion["name"]], command=lambda champ=champion: self.show_champion_details(champ))
-            btn.grid(row=index // 20, column=index % 20, padx=5, pady=(60, 0))  # Arrange in a grid of 10 per row
-
-
+        """Show the champions matching the search term, best match first; existing grid cells are reused."""
+        search_term = self.search_var.get().strip()
+        if not search_term or self.search_index is None:
+            self.champion_grid.show(self.champions)
+        else:
+            self.champion_grid.show(champion_id for champion_id, _ in self.search_index.search(search_term, len(self.search_index)))
 
     def update_item_list(self):
-        for widget in self.items_tab.winfo_children():
-            widget.destroy()
-
-        unique_items = {}
-        for item_id, item in self.items.items():
-            if self.is_item_visible(item) and (not self.map_11_var.get() or item['maps'].get('11', False)):
-                if item["name"] not in unique_items:
-                    unique_items[item["name"]] = item
-                    unique_items[item["name"]]["id"] = item_id
-
-        sorted_unique_items = sorted(unique_items.items(), key=lambda x: x[1]['gold']['total'])
-
-        for index, (item_name, item) in enumerate(sorted_unique_items):
-            img = self.fetch_image(f"https://ddragon.leagueoflegends.com/cdn/{self.latest_version}/img/item/{item['id']}.png", f"{item['id']}.png")
-            if img:
-                self.item_images[item["name"]] = ImageTk.PhotoImage(img)
-
-                name_label = tk.Label(self.items_tab, text=item["name"], wraplength=72)
-                name_label.grid(row=index // 20, column=(index % 20) * 2, padx=3, pady=(0, 20))
-                btn = tk.Button(self.items_tab, image=self.item_images[item["name"]],
-                                command=lambda item=item: self.show_item_details(item))
-                btn.grid(row=index // 20, column=(index % 20) * 2, padx=3, pady=(60, 0))
-
+        """Show the items matching the tag and map filters, one per name; existing grid cells are reused."""
+        map_11 = self.map_11_var.get()
+        names = set()
+        visible = []
+        for item_id in self.item_order:
+            item = self.items[item_id]
+            if item["name"] not in names and self.is_item_visible(item) and (not map_11 or item['maps'].get('11', False)):
+                names.add(item["name"])
+                visible.append(item_id)
+        self.item_grid.show(visible)
 
     def filter_champions(self, event=None):
         self.update_champion_grid()
@@ -218,7 +235,7 @@ class LeagueViewer:
         selected_index = self.champion_list.curselection()
         if selected_index:  # Check if there is a selection
             champion_name = self.champion_list.get(selected_index)
-            champion_image = self.champion_images.get(champion_name)
+            champion_image = self.photo_images.get(f"{champion_name}.png")
 
             # Create or update the label to show the selected champion's image
             if champion_image:  # Ensure the image exists
@@ -254,12 +271,8 @@ class LeagueViewer:
 
     def update_language(self):
         self.current_language = self.language_var.get()
-        self.data_dir = os.path.join(self.version_dir, self.current_language)
-        self.champions = self.load_or_fetch_data("championFull")
-        self.items = self.load_or_fetch_data("item")
-        self.update_champion_grid()
-        self.update_item_list()
         self.update_gui_language()
+        self.load_language(self.current_language)
 
     def update_gui_language(self):
         self.search_label.config(text=self.language_texts["search"][self.current_language])
@@ -267,13 +280,9 @@ class LeagueViewer:
         self.tab_control.tab(0, text=self.language_texts["champions_tab"][self.current_language])
         self.tab_control.tab(1, text=self.language_texts["items_tab"][self.current_language])
 
-    def on_mouse_wheel(self, event):
-        """Handle mouse wheel scrolling."""
-        # Scroll the canvas based on the mouse wheel movement
-        self.champion.yview_scroll(int(-1 * (event.delta / 120)), "units")
-
 
 if __name__ == "__main__":
     root = tk.Tk()
     app = LeagueViewer(root)
     root.mainloop()
+    app.workers.shutdown(wait=False, cancel_futures=True)
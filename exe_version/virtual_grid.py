@@ -0,0 +1,95 @@
+import tkinter as tk
+from tkinter import ttk
+
+
+class VirtualGrid:
+    """Scrollable grid of icon buttons that only has widgets for the rows on screen.
+
+    show(keys) sets which entries are listed and in which order. Scrolling, resizing and
+    filtering reconfigure a small pool of buttons placed on a canvas instead of creating
+    new ones. PhotoImages come from get_image(key) the first time a key is on screen and
+    are kept for the life of the grid; set_image(key, image) swaps one in later.
+    """
+
+    def __init__(self, parent, get_label, get_image, on_click, cell_width=84, cell_height=104):
+        self.get_label = get_label
+        self.get_image = get_image
+        self.on_click = on_click
+        self.cell_width = cell_width
+        self.cell_height = cell_height
+        self.keys = []
+        self.cells = []  # [button, canvas window id, key shown, hidden]
+        self.images = {}
+        self.columns = 1
+
+        self.frame = tk.Frame(parent)
+        self.canvas = tk.Canvas(self.frame, highlightthickness=0)
+        self.scrollbar = ttk.Scrollbar(self.frame, orient="vertical", command=self.canvas.yview)
+        self.canvas.configure(yscrollcommand=self.on_scroll)
+        self.scrollbar.pack(side=tk.RIGHT, fill="y")
+        self.canvas.pack(side=tk.LEFT, fill="both", expand=True)
+        self.canvas.bind("<Configure>", lambda event: self.layout())
+        self.bind_wheel(self.canvas)
+
+    def bind_wheel(self, widget):
+        widget.bind("<MouseWheel>", lambda event: self.canvas.yview_scroll(int(-1 * (event.delta / 120)) or (-1 if event.delta > 0 else 1), "units"))
+        widget.bind("<Button-4>", lambda event: self.canvas.yview_scroll(-1, "units"))
+        widget.bind("<Button-5>", lambda event: self.canvas.yview_scroll(1, "units"))
+
+    def show(self, keys):
+        """List `keys` in order, scrolled back to the top."""
+        self.keys = list(keys)
+        for cell in self.cells:
+            cell[2] = None
+        self.canvas.yview_moveto(0)
+        self.layout()
+
+    def layout(self):
+        self.columns = max(1, self.canvas.winfo_width() // self.cell_width)
+        rows = -(-len(self.keys) // self.columns)
+        self.canvas.configure(scrollregion=(0, 0, self.columns * self.cell_width, rows * self.cell_height), yscrollincrement=self.cell_height // 2)
+        self.refresh()
+
+    def on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        self.refresh()
+
+    def refresh(self):
+        """Point the button pool at the rows currently in view."""
+        first_row = max(0, int(self.canvas.canvasy(0)) // self.cell_height)
+        slots = (self.canvas.winfo_height() // self.cell_height + 2) * self.columns
+        while len(self.cells) < slots:
+            self.cells.append(self.make_cell())
+        for slot, cell in enumerate(self.cells):
+            index = first_row * self.columns + slot
+            if slot < slots and index < len(self.keys):
+                key = self.keys[index]
+                if cell[2] != key:
+                    cell[0].configure(text=self.get_label(key), image=self.image(key) or '', command=lambda key=key: self.on_click(key))
+                    cell[2] = key
+                self.canvas.coords(cell[1], (index % self.columns) * self.cell_width, (index // self.columns) * self.cell_height)
+                if cell[3]:
+                    self.canvas.itemconfigure(cell[1], state="normal")
+                    cell[3] = False
+            elif not cell[3]:
+                self.canvas.itemconfigure(cell[1], state="hidden")
+                cell[3] = True
+
+    def make_cell(self):
+        button = tk.Button(self.canvas, compound="top", wraplength=self.cell_width - 12)
+        self.bind_wheel(button)
+        window = self.canvas.create_window(0, 0, window=button, anchor="nw", width=self.cell_width - 4, height=self.cell_height - 4, state="hidden")
+        return [button, window, None, True]
+
+    def image(self, key):
+        image = self.images.get(key)
+        if image is None:
+            image = self.images[key] = self.get_image(key)
+        return image
+
+    def set_image(self, key, image):
+        """Replace the image of a key, e.g. when its icon finishes downloading."""
+        self.images[key] = image
+        for cell in self.cells:
+            if cell[2] == key:
+                cell[0].configure(image=image or '')
@@ -0,0 +1,14 @@
+# gunicorn -c gunicorn.conf.py
+wsgi_app = "wsgi:create_app(start_poller=False)"
+bind = "0.0.0.0:10000"
+workers = 4
+threads = 4
+preload_app = True
+# Metrics are per worker; /metrics labels every sample with the worker pid, so aggregate with
+# sum without (pid) (rate(...)) in Prometheus.
+
+
+def post_worker_init(worker):
+    # Threads do not survive fork, so each worker runs its own version poller. Only the worker
+    # holding cache/.poller.lock downloads a new patch; the others swap once it is .complete.
+    worker.wsgi.extensions['league_viewer'].poller.start()
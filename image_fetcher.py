@@ -0,0 +1,70 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from image_pipeline import ImagePipeline
+from single_flight import SingleFlight, NegativeCache
+from metrics import DDRAGON_SECONDS, DDRAGON_FETCHES, current_endpoint, fetch_result
+from logs import get_logger
+
+log = get_logger("image_fetcher")
+
+
+class ImageFetcher:
+    """Downloads icons over one shared keep-alive session and hands them to the ImagePipeline."""
+
+    def __init__(self, max_workers=16, pipeline=None, not_found_ttl=3600, failure_ttl=60):
+        self.max_workers = max_workers
+        self.pipeline = pipeline or ImagePipeline()
+        self.not_found_ttl = not_found_ttl
+        self.failure_ttl = failure_ttl
+        self.flights = SingleFlight()
+        self.failures = NegativeCache()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def fetch(self, image_url, image_path, endpoint=None):
+        """Return 'cached', 'downloaded' or 'failed' for a single icon; metrics go to `endpoint` (default: the current one)."""
+        if os.path.exists(image_path):
+            return "cached"
+        if image_url in self.failures:
+            return "failed"
+        endpoint = endpoint or current_endpoint()
+        # Keyed on the path too: the same icon fetched for two languages goes to two directories.
+        return self.flights.do((image_url, image_path), lambda: self._download(image_url, image_path, endpoint))
+
+    def _download(self, image_url, image_path, endpoint):
+        if os.path.exists(image_path):
+            return "cached"
+        status_code = None
+        started = time.perf_counter()
+        try:
+            response = self.session.get(image_url, timeout=10)
+            status_code = response.status_code
+            DDRAGON_SECONDS.observe(time.perf_counter() - started, endpoint, "image")
+            if response.status_code == 404:
+                self.failures.add(image_url, self.not_found_ttl)
+                return "failed"
+            response.raise_for_status()
+            self.pipeline.process(response.content, image_path, endpoint)
+            return "downloaded"
+        except Exception as e:
+            log.warning("Error fetching image from URL: %s, error: %s", image_url, e)
+            self.failures.add(image_url, self.failure_ttl)
+            return "failed"
+        finally:
+            DDRAGON_FETCHES.inc(endpoint, "image", fetch_result(status_code))
+
+    def prefetch(self, images, image_dir):
+        """Fetch (url, name) pairs into image_dir concurrently and return {name: status}."""
+        images = list(images)
+        if not images:
+            return {}
+        endpoint = current_endpoint()
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(images))) as executor:
+            statuses = executor.map(lambda image: self.fetch(image[0], os.path.join(image_dir, image[1]), endpoint), images)
+            return {name: status for (_, name), status in zip(images, statuses)}
@@ -0,0 +1,134 @@
+import io
+import os
+import re
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from PIL import Image
+
+from metrics import IMAGE_PROCESS_SECONDS, current_endpoint
+
+FORMATS = {"png": "PNG", "webp": "WEBP"}
+VARIANT_RE = re.compile(r'^(?P<stem>.+?)(?:@(?P<size>\d+))?\.(?P<ext>png|webp)$')
+
+
+def variant_name(image_name, size, image_format, base_size):
+    """Ahri.png -> Ahri@64.webp. The base size as PNG keeps the plain name used by packs and sprites."""
+    stem = os.path.splitext(image_name)[0]
+    if size == base_size and image_format == "png":
+        return f"{stem}.png"
+    return f"{stem}@{size}.{image_format}"
+
+
+def transcode(data, sizes, formats):
+    """Decode once, then resize and encode every (size, format) pair. Runs in a worker process."""
+    variants = {}
+    with Image.open(io.BytesIO(data)) as source:
+        source = source.convert("RGBA")
+        for size in sizes:
+            image = source.resize((size, size), Image.LANCZOS)
+            for image_format in formats:
+                output = io.BytesIO()
+                image.save(output, FORMATS[image_format])
+                variants[(size, image_format)] = output.getvalue()
+    return variants
+
+
+def write_atomic(path, data):
+    """Write via a temp file and rename, so readers never see a half-written file."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'wb') as file:
+        file.write(data)
+    os.replace(tmp_path, path)
+
+
+class ImagePipeline:
+    """Decode/resize/encode on a ProcessPoolExecutor so icon processing is not bound by the GIL.
+
+    The first size is the base icon (<name>.png) used by grids, sprites and packs; the other
+    sizes and formats are written beside it as <name>@<size>.<format>, so png is always one of
+    the formats. workers=0 transcodes on
+    the calling thread instead, for the desktop viewers where spawning processes costs more
+    than the handful of icons they fetch.
+    """
+
+    def __init__(self, sizes=(32, 64, 128), formats=("png", "webp"), workers=None):
+        if "png" not in formats:
+            raise ValueError("image formats must include png, the format of the base icon")
+        unknown = set(formats) - set(FORMATS)
+        if unknown:
+            raise ValueError(f"unsupported image formats: {', '.join(sorted(unknown))}")
+        self.sizes = tuple(sizes)
+        self.formats = tuple(formats)
+        self.base_size = self.sizes[0]
+        self.workers = workers
+        self._executor = None
+        self._lock = threading.Lock()
+        # A pool created before a fork (gunicorn preload) is unusable in the child.
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._forget_executor)
+
+    def _forget_executor(self):
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def submit(self, data, endpoint=None):
+        """Return a Future of {(size, format): bytes}; the time until it is done, queueing included, is recorded."""
+        endpoint = endpoint or current_endpoint()
+        started = time.perf_counter()
+        if self.workers == 0:
+            future = Future()
+            try:
+                future.set_result(transcode(data, self.sizes, self.formats))
+            except Exception as e:
+                future.set_exception(e)
+        else:
+            future = self.executor.submit(transcode, data, self.sizes, self.formats)
+        future.add_done_callback(lambda _: IMAGE_PROCESS_SECONDS.observe(time.perf_counter() - started, endpoint))
+        return future
+
+    def save(self, variants, image_path):
+        """Write every variant beside image_path; the base PNG goes last so its presence means all are there."""
+        image_name = os.path.basename(image_path)
+        directory = os.path.dirname(image_path)
+        base = (self.base_size, "png")
+        for key, data in variants.items():
+            if key != base:
+                write_atomic(os.path.join(directory, variant_name(image_name, *key, self.base_size)), data)
+        write_atomic(image_path, variants[base])
+
+    def process(self, data, image_path, endpoint=None):
+        self.save(self.submit(data, endpoint).result(), image_path)
+
+    def parse(self, image_name):
+        """Split a requested file name into (base icon name, size, format), or None if it is not a known variant."""
+        match = VARIANT_RE.match(image_name)
+        if not match:
+            return None
+        size = int(match.group('size') or self.base_size)
+        if size not in self.sizes or match.group('ext') not in self.formats:
+            return None
+        return f"{match.group('stem')}.png", size, match.group('ext')
+
+    def best_variant(self, image_name, size):
+        """Name of the configured variant closest to `size` (the next larger one if any), as webp when configured."""
+        larger = [configured for configured in self.sizes if configured >= size]
+        size = min(larger) if larger else max(self.sizes)
+        image_format = "webp" if "webp" in self.formats else "png"
+        return variant_name(image_name, size, image_format, self.base_size)
+
+    @staticmethod
+    def base_name(image_name):
+        """Ahri@64.webp -> Ahri.png for any size or format, configured or not; None for other names."""
+        match = VARIANT_RE.match(image_name)
+        return f"{match.group('stem')}.png" if match else None
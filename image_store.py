@@ -0,0 +1,135 @@
+import hashlib
+import json
+import mmap
+import os
+import threading
+
+
+class ImageStore:
+    """Content-addressed icon packs, one per patch, read through mmap.
+
+    cache/<version>/images.pack holds the icons that first appeared in that patch.
+    cache/<version>/images.index.json maps every icon name of the patch (for all languages)
+    to [pack version, offset, length, sha1]. Icons unchanged since an earlier patch point
+    into that patch's pack instead of being stored again.
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        self._indexes = {}
+        self._packs = {}
+        self._lock = threading.Lock()
+
+    def pack_path(self, version):
+        return os.path.join(self.cache_dir, version, "images.pack")
+
+    def index_path(self, version):
+        return os.path.join(self.cache_dir, version, "images.index.json")
+
+    def index(self, version):
+        """{name: entry} of a packed patch. Patches without an index are not remembered, so
+        looking up arbitrary versions does not grow the cache."""
+        index = self._indexes.get(version)
+        if index is None:
+            if not os.path.exists(self.index_path(version)):
+                return {}
+            with open(self.index_path(version), 'r') as file:
+                index = json.load(file)
+            self._indexes[version] = index
+        return index
+
+    def contains(self, version, name):
+        return name in self.index(version)
+
+    def entry(self, version, name):
+        return self.index(version).get(name)
+
+    def read(self, version, name):
+        """Return the icon bytes, or None when the patch has no packed icon of that name."""
+        entry = self.index(version).get(name)
+        if entry is None:
+            return None
+        pack_version, offset, length, _ = entry
+        return self._pack(pack_version)[offset:offset + length]
+
+    def _pack(self, version):
+        pack = self._packs.get(version)
+        if pack is None:
+            with self._lock:
+                pack = self._packs.get(version)
+                if pack is None:
+                    with open(self.pack_path(version), 'rb') as file:
+                        pack = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+                    self._packs[version] = pack
+        return pack
+
+    def known_blobs(self, before_version, version_key):
+        """{sha1: entry} for every icon packed by patches older than before_version."""
+        blobs = {}
+        if not os.path.isdir(self.cache_dir):
+            return blobs
+        versions = [name for name in os.listdir(self.cache_dir) if os.path.exists(self.index_path(name))]
+        for version in sorted(versions, key=version_key):
+            if version_key(version) >= version_key(before_version):
+                continue
+            for entry in self.index(version).values():
+                blobs.setdefault(entry[3], entry)
+        return blobs
+
+    def build(self, version, image_dirs, version_key, remove_loose=True):
+        """Pack the top-level .png/.webp icons of image_dirs (first directory wins per name) for a patch.
+
+        Returns (new icons, reused icons). Loose icons that made it into the pack are deleted.
+        """
+        if os.path.exists(self.index_path(version)):
+            self._indexes.pop(version, None)
+            return 0, 0
+        sources = {}
+        for image_dir in image_dirs:
+            if not os.path.isdir(image_dir):
+                continue
+            for name in os.listdir(image_dir):
+                if name.endswith(('.png', '.webp')) and os.path.isfile(os.path.join(image_dir, name)):
+                    sources.setdefault(name, os.path.join(image_dir, name))
+
+        known = self.known_blobs(version, version_key)
+        index = {}
+        offset = 0
+        new_count = 0
+        tmp_pack = f"{self.pack_path(version)}.{os.getpid()}.tmp"
+        with open(tmp_pack, 'wb') as pack:
+            for name in sorted(sources):
+                try:
+                    with open(sources[name], 'rb') as file:
+                        data = file.read()
+                except FileNotFoundError:
+                    continue
+                digest = hashlib.sha1(data).hexdigest()
+                if digest in known:
+                    index[name] = known[digest]
+                    continue
+                entry = [version, offset, len(data), digest]
+                pack.write(data)
+                offset += len(data)
+                known[digest] = entry
+                index[name] = entry
+                new_count += 1
+
+        if offset:
+            os.replace(tmp_pack, self.pack_path(version))
+        else:
+            os.remove(tmp_pack)
+        tmp_index = f"{self.index_path(version)}.{os.getpid()}.tmp"
+        with open(tmp_index, 'w') as file:
+            json.dump(index, file)
+        os.replace(tmp_index, self.index_path(version))
+        self._indexes[version] = index
+
+        if remove_loose:
+            for image_dir in image_dirs:
+                for name in index:
+                    try:
+                        os.remove(os.path.join(image_dir, name))
+                    except FileNotFoundError:
+                        pass
+        return new_count, len(index) - new_count
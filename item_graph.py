@@ -0,0 +1,130 @@
+import json
+
+
+class ItemGraph:
+    """Recipe graph of one patch's item.json, built once per (version, language).
+
+    Items are stored by position, ordered by total gold cost like ItemIndex, so iterating a
+    bitmask yields items cheapest first. `components`/`builds_into` are the direct edges,
+    `descendants`/`ancestors` their transitive closures as int bitmasks, `depth` is 0 for
+    basic items and one more than the deepest component otherwise. `combine_costs` is what an
+    item costs on top of its direct components. Each item's full recipe tree is serialized
+    once, so /api/items/<id>/tree is a lookup.
+    """
+
+    def __init__(self, items_data, clean_name=lambda name: name):
+        ordered = sorted(items_data.items(), key=lambda entry: (entry[1]['gold']['total'], entry[0]))
+        self.ids = tuple(item_id for item_id, _ in ordered)
+        self.by_id = {item_id: position for position, item_id in enumerate(self.ids)}
+        self.names = tuple(clean_name(item['name']) for _, item in ordered)
+        self.costs = tuple(item['gold']['total'] for _, item in ordered)
+        # Recipes can use the same component twice (e.g. two Long Swords), so `components` keeps duplicates.
+        self.components = tuple(
+            tuple(self.by_id[component] for component in item.get('from', ()) if component in self.by_id)
+            for _, item in ordered
+        )
+        builds_into = [[] for _ in ordered]
+        for position, components in enumerate(self.components):
+            for component in set(components):
+                builds_into[component].append(position)
+        self.builds_into = tuple(tuple(parents) for parents in builds_into)
+        self.combine_costs = tuple(
+            cost - sum(self.costs[component] for component in components)
+            for cost, components in zip(self.costs, self.components)
+        )
+
+        self.maps = {}
+        for position, (_, item) in enumerate(ordered):
+            for map_id, enabled in item.get('maps', {}).items():
+                if enabled:
+                    self.maps[map_id] = self.maps.get(map_id, 0) | 1 << position
+
+        count = len(self.ids)
+        self.depth = [0] * count
+        self.descendants = [0] * count
+        state = [0] * count  # 0 new, 1 on the current path, 2 done
+        for position in range(count):
+            self._close(position, state)
+        self.depth = tuple(self.depth)
+        self.descendants = tuple(self.descendants)
+
+        ancestors = [0] * count
+        for position in range(count):
+            bit = 1 << position
+            for descendant in self.positions(self.descendants[position]):
+                ancestors[descendant] |= bit
+        self.ancestors = tuple(ancestors)
+        self.trees = tuple(json.dumps(self.tree(position), ensure_ascii=False, separators=(',', ':')) for position in range(count))
+
+    def _close(self, position, state):
+        """Fill depth and descendants of position after its components (iterative DFS, ignores cycles)."""
+        stack = [(position, iter(self.components[position]))]
+        state[position] = 1
+        while stack:
+            current, children = stack[-1]
+            child = next(children, None)
+            if child is not None:
+                if state[child] == 0:
+                    state[child] = 1
+                    stack.append((child, iter(self.components[child])))
+                continue
+            stack.pop()
+            depth, closure = 0, 0
+            for component in self.components[current]:
+                if state[component] == 2:
+                    depth = max(depth, self.depth[component] + 1)
+                    closure |= (1 << component) | self.descendants[component]
+            self.depth[current] = depth
+            self.descendants[current] = closure
+            state[current] = 2
+
+    def __len__(self):
+        return len(self.ids)
+
+    def positions(self, mask):
+        while mask:
+            low_bit = mask & -mask
+            yield low_bit.bit_length() - 1
+            mask ^= low_bit
+
+    def tree(self, position, path=0):
+        """Nested {id, name, gold, combine, depth, from: [...]} recipe tree of an item."""
+        path |= 1 << position
+        return {
+            'id': self.ids[position],
+            'name': self.names[position],
+            'gold': self.costs[position],
+            'combine': self.combine_costs[position],
+            'depth': self.depth[position],
+            'from': [self.tree(component, path) for component in self.components[position] if not path >> component & 1],
+        }
+
+    def tree_json(self, item_id):
+        position = self.by_id.get(item_id)
+        return None if position is None else self.trees[position]
+
+    def summary(self, position):
+        return {'id': self.ids[position], 'name': self.names[position], 'gold': self.costs[position], 'depth': self.depth[position]}
+
+    def direct(self, item_id):
+        """([component summaries], [builds-into summaries]) of an item, de-duplicated, or None."""
+        position = self.by_id.get(item_id)
+        if position is None:
+            return None
+        components = [self.summary(component) for component in dict.fromkeys(self.components[position])]
+        return components, [self.summary(parent) for parent in self.builds_into[position]]
+
+    def buildable(self, component_ids, require_all=False, within=None):
+        """Items whose recipe tree contains any (or every) of the components, cheapest first.
+
+        Unknown ids are ignored. `within` is an optional bitmask of allowed positions (e.g. maps['11']).
+        """
+        masks = [self.ancestors[self.by_id[item_id]] for item_id in component_ids if item_id in self.by_id]
+        if not masks:
+            return []
+        mask = masks[0]
+        for other in masks[1:]:
+            mask = mask & other if require_all else mask | other
+        if within is not None:
+            mask &= within
+        return [self.summary(position) for position in self.positions(mask)]
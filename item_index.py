@@ -0,0 +1,66 @@
+import random
+from array import array
+
+
+class ItemIndex:
+    """Read-only lookup tables over one patch's item.json, built once per (version, language).
+
+    Items are stored by position, ordered by total gold cost. Sets of items (map 11, tags,
+    the de-duplicated shop list) are int bitmasks over those positions.
+    """
+
+    def __init__(self, items_data, clean_name=lambda name: name):
+        ordered = sorted(items_data.items(), key=lambda entry: entry[1]['gold']['total'])
+        self.ids = tuple(item_id for item_id, _ in ordered)
+        self.names = tuple(clean_name(item['name']) for _, item in ordered)
+        self.costs = array('i', (item['gold']['total'] for _, item in ordered))
+        self.records = tuple(dict(item, id=item_id, name=name) for (item_id, item), name in zip(ordered, self.names))
+        self.by_id = {item_id: position for position, item_id in enumerate(self.ids)}
+
+        self.map_11 = 0
+        self.tags = {}
+        self.by_name = {}
+        shop = []
+        seen_names = set()
+        for position, (item_id, item) in enumerate(ordered):
+            bit = 1 << position
+            self.by_name.setdefault(self.names[position], position)
+            if item['maps'].get('11', False):
+                self.map_11 |= bit
+                if item['name'] not in seen_names:
+                    seen_names.add(item['name'])
+                    shop.append(position)
+            for tag in item.get('tags', ()):
+                self.tags[tag] = self.tags.get(tag, 0) | bit
+
+        self.shop_positions = tuple(shop)
+        self.shop = 0
+        for position in shop:
+            self.shop |= 1 << position
+        self.shop_items = tuple((self.names[position], self.records[position]) for position in shop)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def get(self, item_id):
+        position = self.by_id.get(item_id)
+        return None if position is None else self.records[position]
+
+    def tag_mask(self, tags):
+        mask = 0
+        for tag in tags:
+            mask |= self.tags.get(tag, 0)
+        return mask
+
+    def positions(self, mask):
+        while mask:
+            low_bit = mask & -mask
+            yield low_bit.bit_length() - 1
+            mask ^= low_bit
+
+    def question(self, shop_index, wrong_answers=3, rng=random):
+        """The shop item at `shop_index` and `wrong_answers` other shop item names."""
+        count = len(self.shop_positions)
+        wrong_indexes = rng.sample(range(count - 1), min(wrong_answers, count - 1))
+        wrong_names = [self.names[self.shop_positions[index + (index >= shop_index)]] for index in wrong_indexes]
+        return self.records[self.shop_positions[shop_index]], wrong_names
@@ -0,0 +1,163 @@
+import json
+import os
+import threading
+import time
+
+from compact import project, compact_path, load_compact, save_compact
+from metrics import DDRAGON_SECONDS, DDRAGON_FETCHES, current_endpoint, fetch_result
+
+DDRAGON_URL = "https://ddragon.leagueoflegends.com"
+FALLBACK_VERSION = "12.6.1"
+
+# Heavier building blocks are imported on first use (league_core.ItemIndex, ...), so a front end
+# that only needs datasets does not pay for requests, PIL or numpy at startup. The imports are
+# spelled out rather than going through importlib so PyInstaller's analysis of the desktop
+# executable still finds and bundles these modules.
+def __getattr__(name):
+    if name == "DataStore":
+        from data_store import DataStore as value
+    elif name == "ImageFetcher":
+        from image_fetcher import ImageFetcher as value
+    elif name == "ImagePipeline":
+        from image_pipeline import ImagePipeline as value
+    elif name == "ImageStore":
+        from image_store import ImageStore as value
+    elif name == "ItemIndex":
+        from item_index import ItemIndex as value
+    elif name == "ItemGraph":
+        from item_graph import ItemGraph as value
+    elif name == "SearchIndex":
+        from search_index import SearchIndex as value
+    elif name == "champion_entries":
+        from search_index import champion_entries as value
+    elif name == "item_entries":
+        from search_index import item_entries as value
+    elif name == "ChampionStats":
+        from champion_stats import ChampionStats as value
+    elif name == "clean_text":
+        from descriptions import clean_text as value
+    else:
+        raise AttributeError(f"module 'league_core' has no attribute '{name}'")
+    globals()[name] = value
+    return value
+
+
+class DataDragon:
+    """Data Dragon access shared by the web app and the desktop viewers.
+
+    Owns the cache layout: datasets and loose icons under cache/<version>/<language>/, packed
+    icons in cache/<version>/images.pack, a .complete marker per fully warmed patch. Icons are
+    fetched through `fetcher` (an ImageFetcher writing every variant by default), JSON through
+    `http`, anything with a requests-style get(url, timeout=) (the requests module by default).
+    """
+
+    def __init__(self, cache_dir="cache", ddragon_url=DDRAGON_URL, fetcher=None, image_workers=None, http=None):
+        self.cache_dir = cache_dir
+        self.ddragon_url = ddragon_url
+        self.http = http
+        self.image_workers = image_workers
+        self._fetcher = fetcher
+        self._image_store = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def version_key(version):
+        return tuple(int(part) if part.isdigit() else 0 for part in version.split('.'))
+
+    def latest_version(self, fallback=FALLBACK_VERSION):
+        try:
+            return self.get_json(f"{self.ddragon_url}/api/versions.json", "versions", timeout=10)[0]
+        except (OSError, ValueError, IndexError):  # requests.RequestException is an OSError
+            return fallback
+
+    def get_json(self, url, kind, timeout):
+        """GET a Data Dragon JSON file, counted and timed per kind in the metrics registry."""
+        http = self.http
+        if http is None:
+            import requests as http
+
+        endpoint = current_endpoint()
+        status_code = None
+        started = time.perf_counter()
+        try:
+            response = http.get(url, timeout=timeout)
+            status_code = response.status_code
+            DDRAGON_SECONDS.observe(time.perf_counter() - started, endpoint, kind)
+            return response.json()
+        finally:
+            DDRAGON_FETCHES.inc(endpoint, kind, fetch_result(status_code))
+
+    def cached_versions(self):
+        """Patches whose every dataset and icon is on disk, oldest first."""
+        if not os.path.isdir(self.cache_dir):
+            return []
+        versions = [name for name in os.listdir(self.cache_dir) if os.path.exists(os.path.join(self.cache_dir, name, ".complete"))]
+        return sorted(versions, key=self.version_key)
+
+    def language_dir(self, version, language):
+        return os.path.join(self.cache_dir, version, language)
+
+    def image_url(self, version, kind, name):
+        return f"{self.ddragon_url}/cdn/{version}/img/{kind}/{name}.png"
+
+    def load_data(self, version, language, data_type):
+        """Load the compact projection of a dataset, building it from the JSON (downloaded if needed) once."""
+        data_path = os.path.join(self.language_dir(version, language), f"{data_type}.json")
+        data = load_compact(compact_path(data_path))
+        if data is not None:
+            return data
+
+        if os.path.exists(data_path):
+            with open(data_path, 'r') as file:
+                response = json.load(file)
+        else:
+            url = f"{self.ddragon_url}/cdn/{version}/data/{language}/{data_type}.json"
+            response = self.get_json(url, "dataset", timeout=30)['data']
+
+            os.makedirs(os.path.dirname(data_path), exist_ok=True)
+            tmp_path = f"{data_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w') as file:
+                json.dump(response, file)
+            os.replace(tmp_path, data_path)
+
+        data = project(data_type, response)
+        save_compact(compact_path(data_path), data)
+        return data
+
+    @property
+    def image_store(self):
+        if self._image_store is None:
+            from image_store import ImageStore
+
+            self._image_store = ImageStore(self.cache_dir)
+        return self._image_store
+
+    @property
+    def fetcher(self):
+        if self._fetcher is None:
+            with self._lock:
+                if self._fetcher is None:
+                    from image_fetcher import ImageFetcher
+                    from image_pipeline import ImagePipeline
+
+                    self._fetcher = ImageFetcher(pipeline=ImagePipeline(workers=self.image_workers))
+        return self._fetcher
+
+    def read_icon(self, version, language, image_name):
+        """Bytes of a packed or loose icon, or None when it is not cached."""
+        data = self.image_store.read(version, image_name)
+        if data is None:
+            image_path = os.path.join(self.language_dir(version, language), image_name)
+            if os.path.exists(image_path):
+                with open(image_path, 'rb') as file:
+                    data = file.read()
+        return data
+
+    def icon(self, version, language, kind, name):
+        """Bytes of the base icon of a champion/spell/item, downloading it first if needed; None on failure."""
+        image_name = f"{name}.png"
+        data = self.read_icon(version, language, image_name)
+        if data is None:
+            self.fetcher.fetch(self.image_url(version, kind, name), os.path.join(self.language_dir(version, language), image_name))
+            data = self.read_icon(version, language, image_name)
+        return data
@@ -0,0 +1,50 @@
+import logging
+import threading
+
+LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+
+class SampleFilter(logging.Filter):
+    """Passes 1 in `every` records below `level` per message template; records at `level` and above always pass.
+
+    Messages use %-style arguments (log.warning("... %s", url)), so one template covers every
+    icon or URL and a failing CDN logs a few lines per hundred failures instead of each one.
+    """
+
+    def __init__(self, every=100, level=logging.ERROR):
+        super().__init__()
+        self.every = every
+        self.level = level
+        self.seen = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno >= self.level or self.every <= 1:
+            return True
+        key = (record.name, record.msg)
+        with self._lock:
+            count = self.seen.get(key, 0)
+            self.seen[key] = count + 1
+        if count % self.every:
+            return False
+        if count:
+            record.msg = f"{record.msg} (1 of {self.every} logged)"
+        return True
+
+
+def get_logger(name):
+    return logging.getLogger(f"league.{name}")
+
+
+def configure(level="INFO", sample_every=100):
+    """Send the league.* loggers to stderr at `level`, sampling everything below ERROR."""
+    logger = logging.getLogger("league")
+    logger.setLevel(level)
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    handler.addFilter(SampleFilter(sample_every))
+    logger.addHandler(handler)
+    logger.propagate = False
+    return logger
@@ -0,0 +1,150 @@
+import bisect
+import os
+import sys
+import threading
+
+# Prometheus' default latency buckets, in seconds.
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+
+
+def format_labels(names, values, *extra):
+    pairs = [f'{name}="{escape(value)}"' for name, value in zip(names, values)]
+    pairs.extend(pair for pair in extra if pair)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic count per label tuple, e.g. requests_total{endpoint="index", status="200"}."""
+
+    kind = "counter"
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def samples(self, extra=""):
+        with self._lock:
+            values = dict(self._values)
+        for label_values, value in sorted(values.items()):
+            yield self.name, format_labels(self.labels, label_values, extra), value
+
+
+class Histogram:
+    """Observations per label tuple in cumulative buckets, plus their sum and count."""
+
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labels=(), buckets=BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._values = {}  # label values -> [count per bucket (last is +Inf), sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(label_values)
+            if entry is None:
+                entry = self._values[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    def samples(self, extra=""):
+        with self._lock:
+            values = {label_values: (list(counts), total) for label_values, (counts, total) in self._values.items()}
+        for label_values, (counts, total) in sorted(values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                yield f"{self.name}_bucket", format_labels(self.labels, label_values, f'le="{format_value(bound)}"', extra), cumulative
+            yield f"{self.name}_sum", format_labels(self.labels, label_values, extra), total
+            yield f"{self.name}_count", format_labels(self.labels, label_values, extra), cumulative
+
+
+class Registry:
+    """Metrics of this process, rendered in the Prometheus text format by /metrics.
+
+    Collectors passed to render() are callables run at scrape time that yield
+    (name, type, help, [(labels, value)]) for numbers other objects already keep, like the
+    DataStore and PageCache hit counters. Under gunicorn every worker has its own registry and
+    a scrape sees whichever worker answered, so every sample carries a pid label: each worker
+    is its own series, and rate() or sum without (pid) over them stays correct whichever
+    worker a scrape lands on.
+    """
+
+    def __init__(self):
+        self.metrics = []
+
+    def counter(self, name, help_text, labels=()):
+        return self.register(Counter(name, help_text, labels))
+
+    def histogram(self, name, help_text, labels=(), buckets=BUCKETS):
+        return self.register(Histogram(name, help_text, labels, buckets))
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self, *collectors):
+        # Read at scrape time: with preload_app the registry is created before gunicorn forks.
+        pid = f'pid="{os.getpid()}"'
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.help_text}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(f"{name}{labels} {format_value(value)}" for name, labels, value in metric.samples(pid))
+        for collector in collectors:
+            for name, kind, help_text, samples in collector():
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                lines.extend(f"{name}{format_labels(tuple(labels), tuple(labels.values()), pid)} {format_value(value)}" for labels, value in samples)
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+REQUEST_SECONDS = REGISTRY.histogram("league_request_duration_seconds", "Time to handle a request, per Flask endpoint.", ("endpoint", "method"))
+REQUESTS = REGISTRY.counter("league_requests_total", "Requests handled, per Flask endpoint and status code.", ("endpoint", "status"))
+# Everything below is also labelled with the endpoint it ran for (see current_endpoint).
+TEMPLATE_SECONDS = REGISTRY.histogram("league_template_render_seconds", "Time to render a Jinja template.", ("endpoint", "template"))
+DDRAGON_SECONDS = REGISTRY.histogram("league_ddragon_fetch_duration_seconds", "Time of outbound Data Dragon requests.", ("endpoint", "kind"))
+DDRAGON_FETCHES = REGISTRY.counter("league_ddragon_fetches_total", "Outbound Data Dragon requests, per kind and result.", ("endpoint", "kind", "result"))
+IMAGE_PROCESS_SECONDS = REGISTRY.histogram("league_image_process_duration_seconds", "Time to resize and encode every variant of a downloaded icon.", ("endpoint",))
+IMAGE_CACHE = REGISTRY.counter("league_image_cache_lookups_total", "Icon lookups answered from the pack or disk (hit) or needing a download (miss).", ("endpoint", "result"))
+
+
+def current_endpoint():
+    """Flask endpoint of the request this thread is handling ('unmatched' for unknown URLs), or
+    'background' for the poller, prewarm and other work outside a request.
+
+    Work handed to another thread (icon downloads, transcoding) runs outside the request, so
+    callers read this first and pass it along.
+    """
+    flask = sys.modules.get("flask")  # not imported by the desktop viewers
+    if flask is None or not flask.has_request_context():
+        return "background"
+    return flask.request.endpoint or "unmatched"
+
+
+def fetch_result(status_code):
+    """Result label of an outbound request: 2xx/4xx/5xx, or 'error' when no response arrived."""
+    return f"{status_code // 100}xx" if status_code else "error"
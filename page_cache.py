@@ -0,0 +1,61 @@
+import threading
+from collections import OrderedDict
+
+
+class PageCache:
+    """LRU cache of rendered pages keyed by (version, language, kind, ...), bounded by total bytes."""
+
+    def __init__(self, max_bytes=32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._pages = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            page = self._pages.get(key)
+            if page is None:
+                self.misses += 1
+                return None
+            self._pages.move_to_end(key)
+            self.hits += 1
+            return page[0]
+
+    def put(self, key, html, page_bytes=None):
+        """Store a page; page_bytes defaults to its UTF-8 length and must be given for anything but str."""
+        if page_bytes is None:
+            page_bytes = len(html.encode('utf-8'))
+        if page_bytes > self.max_bytes:
+            return
+        with self._lock:
+            old = self._pages.pop(key, None)
+            if old is not None:
+                self.size -= old[1]
+            self._pages[key] = (html, page_bytes)
+            self.size += page_bytes
+            while self.size > self.max_bytes:
+                _, (_, evicted_bytes) = self._pages.popitem(last=False)
+                self.size -= evicted_bytes
+                self.evictions += 1
+
+    def invalidate(self, version=None):
+        """Drop every page of `version`, or everything when no version is given."""
+        with self._lock:
+            for key in list(self._pages):
+                if version is None or key[0] == version:
+                    self.size -= self._pages.pop(key)[1]
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0,
+            "evictions": self.evictions,
+            "pages": len(self._pages),
+            "bytes": self.size,
+            "max_bytes": self.max_bytes,
+        }
@@ -0,0 +1,87 @@
+import random
+import secrets
+import threading
+import time
+from array import array
+from collections import OrderedDict
+
+
+class QuizSession:
+    __slots__ = ('version', 'language', 'seed', 'deck', 'cursor', 'touched')
+
+    def __init__(self, version, language, seed, size):
+        self.version = version
+        self.language = language
+        self.seed = seed
+        self.deck = array('H', range(size))
+        random.Random(seed).shuffle(self.deck)
+        self.cursor = 0
+        self.touched = time.monotonic()
+
+    def rng(self, position):
+        """Random source of one question, so the same position always gets the same wrong answers."""
+        return random.Random(self.seed * 1000003 + position)
+
+
+class QuizEngine:
+    """Server-side quiz rounds: a shuffled deck of question numbers per session, dealt in batches.
+
+    A deck is a permutation of range(size) drawn from the session's seed, so questions are
+    sampled without replacement. The session id is '<version>-<language>-<seed>', which lets
+    any worker rebuild the deck after the LRU (or another gunicorn worker) lost it; clients
+    pass the offset they have reached, so the cursor survives that too. Per session only the
+    deck (2 bytes per question) and the cursor are kept.
+    """
+
+    def __init__(self, max_sessions=10000, ttl=3600):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def parse(session_id):
+        """(version, language, seed) of a session id, or None when it is malformed."""
+        try:
+            version, language, seed = session_id.rsplit('-', 2)
+            return version, language, int(seed, 16)
+        except (AttributeError, ValueError):
+            return None
+
+    def start(self, version, language):
+        """Id of a new session; its deck is built on the first deal."""
+        return f"{version}-{language}-{secrets.randbits(63):x}"
+
+    def deal(self, kind, session_id, n, size_for, offset=None):
+        """(session, [(position, question number), ...]) for the next n questions, or None for a bad id.
+
+        size_for(version, language) returns the deck size when the session has to be (re)built.
+        """
+        parsed = self.parse(session_id)
+        if parsed is None:
+            return None
+        key = (kind, session_id)
+        now = time.monotonic()
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is not None and now - session.touched > self.ttl:
+                session = None
+        if session is None:
+            # Built outside the lock: the deck size may need a dataset load.
+            built = QuizSession(*parsed, size_for(*parsed[:2]))
+            with self._lock:
+                session = self._sessions.setdefault(key, built)
+                if session is not built and now - session.touched > self.ttl:
+                    session = self._sessions[key] = built
+                while len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)
+        with self._lock:
+            self._sessions.move_to_end(key)
+            session.touched = now
+            start = session.cursor if offset is None else min(max(offset, 0), len(session.deck))
+            end = min(start + n, len(session.deck))
+            session.cursor = end
+        return session, [(position, session.deck[position]) for position in range(start, end)]
+
+    def stats(self):
+        return {"sessions": len(self._sessions), "max_sessions": self.max_sessions}
@@ -0,0 +1,134 @@
+import heapq
+import re
+import unicodedata
+
+from descriptions import clean_text
+
+# NFKD leaves these as they are, so they are mapped by hand (ł is common in Polish names).
+EXTRA_FOLDS = str.maketrans({'ł': 'l', 'Ł': 'L', 'ø': 'o', 'Ø': 'O', 'æ': 'ae', 'Æ': 'AE', 'ß': 'ss'})
+# Dropped, not split on: "Kai'Sa" is found as "kaisa" and "Dr. Mundo" as "dr mundo".
+DROPPED = str.maketrans('', '', "'’‘`´.")
+WORD_RE = re.compile(r'\w+')
+STATS_RE = re.compile(r'\[stats\](.*?)\[/stats\]', re.DOTALL)
+CAMEL_RE = re.compile(r'(?<=[a-z])(?=[A-Z])')
+
+# Lower ranks sort first; a match on the name beats a spell name, which beats a tag or a stat.
+FIELD_RANKS = {'name': 0, 'spell': 1, 'tag': 2, 'stat': 3}
+# Within a field: the query starts the field, starts a later word of it, or only occurs inside it.
+START, WORD, SUBSTRING = 0, 1, 2
+
+
+def fold(text):
+    """Lower case without accents or apostrophes, so 'Łucznik', 'lucznik' and 'LUCZNIK' all match."""
+    text = unicodedata.normalize('NFKD', text.translate(EXTRA_FOLDS).translate(DROPPED))
+    return ''.join(char for char in text if not unicodedata.combining(char)).lower()
+
+
+def trigrams(text):
+    return {text[index:index + 3] for index in range(len(text) - 2)}
+
+
+def champion_entries(champions_data):
+    """(id, name, [(field, text), ...]) for every champion: its name, spell names and tags."""
+    for champion_id, champion in champions_data.items():
+        fields = [('name', champion['name'])]
+        fields += [('spell', spell['name']) for spell in champion['spells']]
+        fields += [('tag', tag) for tag in champion.get('tags', ())]
+        yield champion_id, champion['name'], fields
+
+
+def item_entries(items_data):
+    """(id, name, fields) for every map 11 item: its name, tags, the stat lines of its description and its stat keys."""
+    seen_names = set()
+    for item_id, item in items_data.items():
+        name = clean_text(item['name'])
+        if not item['maps'].get('11', False) or name in seen_names:
+            continue
+        seen_names.add(name)
+        fields = [('name', name)]
+        fields += [('tag', tag) for tag in item.get('tags', ())]
+        for stats in STATS_RE.findall(clean_text(item['description'], keep=('stats',))):
+            fields += [('stat', line) for line in stats.split('\n') if line.strip()]
+        fields += [('stat', CAMEL_RE.sub(' ', key)) for key in item.get('stats', ())]
+        yield item_id, name, fields
+
+
+class SearchIndex:
+    """Prefix trie over the words of every searchable field plus a trigram index for infix matches.
+
+    Each trie node keeps {position: best rank} of every entry with a word starting at that
+    prefix, so a query word costs one walk down the trie. Multi-word queries intersect the
+    nodes of all words. Queries that find fewer than k entries that way fall back to the
+    trigram postings, verified with a substring test.
+    """
+
+    def __init__(self, entries):
+        self.ids = []
+        self.names = []
+        self.texts = []
+        self.root = ({}, {})
+        self.grams = {}
+        for position, (entry_id, name, fields) in enumerate(entries):
+            self.ids.append(entry_id)
+            self.names.append(name)
+            texts = []
+            for field, text in fields:
+                folded = fold(text)
+                texts.append((FIELD_RANKS[field], folded))
+                for index, word in enumerate(WORD_RE.findall(folded)):
+                    self._insert(word, position, FIELD_RANKS[field] * 3 + (START if index == 0 else WORD))
+                for gram in trigrams(folded):
+                    self.grams.setdefault(gram, set()).add(position)
+            self.texts.append(tuple(texts))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _insert(self, word, position, rank):
+        node = self.root
+        for char in word:
+            node = node[0].setdefault(char, ({}, {}))
+            if rank < node[1].get(position, rank + 1):
+                node[1][position] = rank
+
+    def _prefix_hits(self, word):
+        node = self.root
+        for char in word:
+            node = node[0].get(char)
+            if node is None:
+                return {}
+        return node[1]
+
+    def _substring_hits(self, query):
+        grams = trigrams(query)
+        if not grams:
+            return {}
+        postings = sorted((self.grams.get(gram, ()) for gram in grams), key=len)
+        candidates = set(postings[0]).intersection(*postings[1:])
+        hits = {}
+        for position in candidates:
+            ranks = [field_rank * 3 + SUBSTRING for field_rank, text in self.texts[position] if query in text]
+            if ranks:
+                hits[position] = min(ranks)
+        return hits
+
+    def search(self, query, k=10):
+        """Return up to k (id, name) pairs, best match first."""
+        query = fold(query).strip()
+        words = WORD_RE.findall(query)
+        if not words:
+            return []
+        scores = None
+        for word in sorted(words, key=len, reverse=True):
+            hits = self._prefix_hits(word)
+            if scores is None:
+                scores = dict(hits)
+            else:
+                scores = {position: score + hits[position] for position, score in scores.items() if position in hits}
+            if not scores:
+                break
+        if len(scores) < k:
+            for position, rank in self._substring_hits(query).items():
+                scores.setdefault(position, rank * len(words))
+        best = heapq.nsmallest(k, scores, key=lambda position: (scores[position], self.names[position]))
+        return [(self.ids[position], self.names[position]) for position in best]
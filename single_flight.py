@@ -0,0 +1,64 @@
+import threading
+import time
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time; concurrent callers of the same key share its result."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.shared = 0
+
+    def do(self, key, function):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.shared += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = function()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+
+class NegativeCache:
+    """Remembers failed keys (404s, timeouts) until their TTL runs out."""
+
+    def __init__(self):
+        self._expiry = {}
+
+    def add(self, key, ttl):
+        self._expiry[key] = time.monotonic() + ttl
+
+    def __contains__(self, key):
+        expiry = self._expiry.get(key)
+        if expiry is None:
+            return False
+        if expiry <= time.monotonic():
+            self._expiry.pop(key, None)
+            return False
+        return True
+
+    def __len__(self):
+        return len(self._expiry)
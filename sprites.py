@@ -0,0 +1,61 @@
+import io
+import json
+import math
+import os
+import threading
+
+from PIL import Image
+
+
+def build_sprite(read_icon, names, sprite_path, size=32, columns=16, image_format="PNG"):
+    """Pack the icons `names` into one atlas and return ({name: [x, y]}, [missing names]).
+
+    read_icon(name) returns the encoded icon bytes or None. Missing icons get a gray tile and
+    are listed, so the atlas can be rebuilt once they arrive. Both go next to the atlas as
+    <sprite>.json.
+    """
+    names = list(names)
+    rows = max(1, math.ceil(len(names) / columns))
+    atlas = Image.new("RGBA", (columns * size, rows * size), (0, 0, 0, 0))
+    offsets = {}
+    missing = []
+    for index, name in enumerate(names):
+        x, y = (index % columns) * size, (index // columns) * size
+        data = read_icon(name)
+        if data is not None:
+            with Image.open(io.BytesIO(data)) as icon:
+                tile = icon.convert("RGBA")
+                if tile.size != (size, size):
+                    tile = tile.resize((size, size))
+        else:
+            tile = Image.new("RGBA", (size, size), "gray")
+            missing.append(name)
+        atlas.paste(tile, (x, y))
+        offsets[name] = [x, y]
+
+    # Written to temp files and renamed, atlas first: another request may be reading the map meanwhile.
+    os.makedirs(os.path.dirname(sprite_path), exist_ok=True)
+    suffix = f"{os.getpid()}.{threading.get_ident()}.tmp"
+    atlas.save(f"{sprite_path}.{suffix}", image_format)
+    os.replace(f"{sprite_path}.{suffix}", sprite_path)
+    map_path = sprite_map_path(sprite_path)
+    with open(f"{map_path}.{suffix}", "w") as file:
+        json.dump({"offsets": offsets, "missing": missing}, file)
+    os.replace(f"{map_path}.{suffix}", map_path)
+    return offsets, missing
+
+
+def load_sprite(sprite_path):
+    """Return (offsets, missing names) of an existing atlas, or None when it has not been built."""
+    map_path = sprite_map_path(sprite_path)
+    if not (os.path.exists(sprite_path) and os.path.exists(map_path)):
+        return None
+    with open(map_path, "r") as file:
+        sprite_map = json.load(file)
+    if "offsets" not in sprite_map:
+        return None  # written before missing icons were recorded; rebuild
+    return sprite_map["offsets"], sprite_map["missing"]
+
+
+def sprite_map_path(sprite_path):
+    return os.path.splitext(sprite_path)[0] + ".json"
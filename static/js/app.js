@@ -5,9 +5,20 @@ document.addEventListener('DOMContentLoaded', function () {
     loadChampions();
 });
 
-function loadChampions() {
-    fetch('/api/champions')
+function fetchAllChampions(query) {
+    // Follow the API cursors until the last page and key the champions by id.
+    const champions = {};
+    const fetchPage = cursor => fetch(`/api/champions?fields=id,name&limit=200${query}${cursor ? `&cursor=${cursor}` : ''}`)
         .then(response => response.json())
+        .then(page => {
+            page.data.forEach(champion => { champions[champion.id] = champion; });
+            return page.next ? fetchPage(page.next) : champions;
+        });
+    return fetchPage(null);
+}
+
+function loadChampions() {
+    fetchAllChampions('')
         .then(data => {
             championsData = data;
             filteredChampions = championsData;
@@ -36,17 +47,24 @@ function updateChampionGrid() {
 }
 
 function filterChampions() {
-    const searchTerm = document.getElementById('champion-search').value.toLowerCase();
-    filteredChampions = Object.values(championsData).filter(champion =>
-        champion.name.toLowerCase().includes(searchTerm)
-    );
-    updateChampionGrid();
+    const searchTerm = document.getElementById('champion-search').value.trim();
+    if (!searchTerm) {
+        filteredChampions = championsData;
+        updateChampionGrid();
+        return;
+    }
+    fetch(`/api/search?type=champion&limit=50&q=${encodeURIComponent(searchTerm)}`)
+        .then(response => response.json())
+        .then(results => {
+            filteredChampions = results.map(result => championsData[result.id]).filter(Boolean);
+            updateChampionGrid();
+        })
+        .catch(error => console.error('Error searching champions:', error));
 }
 
 function updateLanguage() {
     const language = document.getElementById('language-select').value;
-    fetch(`/api/champions?lang=${language}`)
-        .then(response => response.json())
+    fetchAllChampions(`&lang=${language}`)
         .then(data => {
             championsData = data;
             filteredChampions = championsData;
@@ -0,0 +1,153 @@
+import io
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+VERSION = "14.1.1"
+
+CHAMPIONS = {
+    "en_US": {"Ahri": ("Ahri", "the Nine-Tailed Fox"), "Annie": ("Annie", "the Dark Child")},
+    "pl_PL": {"Ahri": ("Ahri", "Dziewięcioogoniasta Lisica"), "Annie": ("Annie", "Dziecko Ciemności")},
+}
+ITEMS = {
+    "en_US": {"1001": "Boots", "1036": "Long Sword", "3071": "Black Cleaver"},
+    "pl_PL": {"1001": "Buty", "1036": "Długi Miecz", "3071": "Czarny Tasak"},
+}
+STATS = {"hp": 600, "hpperlevel": 100, "armor": 20, "armorperlevel": 4, "attackdamage": 60, "attackdamageperlevel": 3}
+
+
+def icon_bytes(color):
+    output = io.BytesIO()
+    Image.new("RGBA", (32, 32), color).save(output, "PNG")
+    return output.getvalue()
+
+
+def champion(champion_id, name, title):
+    return {
+        "id": champion_id, "key": str(len(champion_id)), "name": name, "title": title,
+        "image": {"full": f"{champion_id}.png"}, "tags": ["Mage"], "stats": dict(STATS),
+        "spells": [{"id": f"{champion_id}{key}", "name": f"{name} {key}", "description": f"{title} {key}"} for key in "QWER"],
+        "skins": [{"name": "default"}],
+    }
+
+
+def item(item_id, name, total, into=(), components=()):
+    return {
+        "name": name, "description": f"<mainText>{name}</mainText>", "plaintext": name,
+        "image": {"full": f"{item_id}.png"}, "gold": {"total": total, "sell": total // 2},
+        "maps": {"11": True}, "tags": ["Damage"], "into": list(into), "from": list(components), "stats": {"FlatPhysicalDamageMod": 10},
+    }
+
+
+def patch_data(language):
+    """(championFull, item) datasets of the fixture patch in one language."""
+    champions = {champion_id: champion(champion_id, *names) for champion_id, names in CHAMPIONS[language].items()}
+    names = ITEMS[language]
+    items = {
+        "1001": item("1001", names["1001"], 300),
+        "1036": item("1036", names["1036"], 350, into=["3071"]),
+        "3071": item("3071", names["3071"], 3100, components=["1036", "1036"]),
+    }
+    return champions, items
+
+
+def write_patch(cache_dir, version=VERSION, complete=True):
+    """A tiny Data Dragon patch on disk: both languages, loose icons for everything, optional .complete marker."""
+    for language in CHAMPIONS:
+        language_dir = os.path.join(cache_dir, version, language)
+        os.makedirs(language_dir, exist_ok=True)
+        champions, items = patch_data(language)
+        with open(os.path.join(language_dir, "championFull.json"), "w") as file:
+            json.dump(champions, file)
+        with open(os.path.join(language_dir, "item.json"), "w") as file:
+            json.dump(items, file)
+        icons = list(champions) + [spell["id"] for data in champions.values() for spell in data["spells"]] + list(items)
+        for name in icons:
+            with open(os.path.join(language_dir, f"{name}.png"), "wb") as file:
+                file.write(icon_bytes("red"))
+    if complete:
+        open(os.path.join(cache_dir, version, ".complete"), "w").close()
+
+
+class FakeCDN(ThreadingHTTPServer):
+    """Local stand-in for Data Dragon: after `delay` seconds serves JSON from `files` by path, a red icon for
+    any other path, and counts hits."""
+
+    daemon_threads = True
+
+    def __init__(self, delay, files=None):
+        self.delay = delay
+        self.files = dict(files or {})
+        self.hits = {}
+        self.lock = threading.Lock()
+        super().__init__(("127.0.0.1", 0), FakeCDNHandler)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class FakeCDNHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        with self.server.lock:
+            self.server.hits[self.path] = self.server.hits.get(self.path, 0) + 1
+        time.sleep(self.server.delay)
+        if self.path in self.server.files:
+            body, content_type = json.dumps(self.server.files[self.path]).encode(), "application/json"
+        else:
+            body, content_type = icon_bytes("red"), "image/png"
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def fake_cdn():
+    server = FakeCDN(delay=0.5)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def make_viewer(tmp_path, monkeypatch):
+    """Build LeagueViewers serving the fixture patch from tmp_path/cache, with no poller running.
+
+    Data Dragon is an unreachable port unless ddragon_url is given.
+    """
+    import app as app_module
+
+    monkeypatch.chdir(tmp_path)
+    write_patch(os.path.join(tmp_path, "cache"))
+    app_module.data_store.invalidate()
+
+    def make(**kwargs):
+        kwargs.setdefault("ddragon_url", "http://127.0.0.1:9")
+        kwargs.setdefault("image_formats", ("png",))
+        viewer = app_module.LeagueViewer(offline=True, **kwargs)
+        viewer.image_pipeline.workers = 0
+        viewer.app.testing = True
+        viewer.ready.set()
+        return viewer
+
+    yield make
+    app_module.data_store.invalidate()
+
+
+@pytest.fixture
+def viewer(make_viewer):
+    return make_viewer()
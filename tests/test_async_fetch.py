@@ -0,0 +1,102 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from async_fetcher import AsyncImageFetcher
+from image_fetcher import ImageFetcher
+from image_pipeline import ImagePipeline
+from threaded_asgi import ThreadedWsgiToAsgi
+
+
+def concurrent_misses(fetcher, fake_cdn, tmp_path, count=8):
+    url = f"{fake_cdn.url}/cdn/14.1.1/img/champion/Ahri.png"
+    path = os.path.join(tmp_path, "Ahri.png")
+    with ThreadPoolExecutor(max_workers=count) as executor:
+        statuses = list(executor.map(lambda _: fetcher.fetch(url, path), range(count)))
+    return statuses, path
+
+
+def test_concurrent_misses_download_once(fake_cdn, tmp_path):
+    statuses, path = concurrent_misses(ImageFetcher(pipeline=ImagePipeline(workers=0)), fake_cdn, tmp_path)
+    assert set(statuses) <= {"downloaded", "cached"}
+    assert sum(fake_cdn.hits.values()) == 1
+    assert os.path.exists(path)
+
+
+def test_concurrent_async_misses_download_once(fake_cdn, tmp_path):
+    statuses, path = concurrent_misses(AsyncImageFetcher(pipeline=ImagePipeline(workers=0)), fake_cdn, tmp_path)
+    assert set(statuses) <= {"downloaded", "cached"}
+    assert sum(fake_cdn.hits.values()) == 1
+    assert os.path.exists(path)
+
+
+def test_concurrent_misses_for_two_languages_write_both(fake_cdn, tmp_path):
+    url = f"{fake_cdn.url}/cdn/14.1.1/img/champion/Ahri.png"
+    paths = [os.path.join(tmp_path, language, "Ahri.png") for language in ("pl_PL", "en_US")] * 4
+    for fetcher in (ImageFetcher(pipeline=ImagePipeline(workers=0)), AsyncImageFetcher(pipeline=ImagePipeline(workers=0))):
+        for path in set(paths):
+            if os.path.exists(path):
+                os.remove(path)
+        with ThreadPoolExecutor(max_workers=len(paths)) as executor:
+            list(executor.map(lambda path: fetcher.fetch(url, path), paths))
+        assert all(os.path.exists(path) for path in paths)
+
+
+async def asgi_get(app, path, query=b""):
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": path, "query_string": query, "headers": [],
+             "http_version": "1.1", "root_path": "", "scheme": "http", "server": ("testserver", 80)}
+    started = time.perf_counter()
+    await app(scope, receive, send)
+    return messages[0]["status"], time.perf_counter() - started
+
+
+def test_a_request_waiting_on_the_cdn_does_not_stall_the_others(make_viewer, fake_cdn):
+    viewer = make_viewer(ddragon_url=fake_cdn.url, async_fetch=True)
+    language_dir = viewer.language_dir("en_US")
+    for item_id in ("1001", "1036", "3071"):
+        os.remove(os.path.join(language_dir, f"{item_id}.png"))
+    app = ThreadedWsgiToAsgi(viewer.app)
+
+    async def run():
+        slow = asyncio.ensure_future(asgi_get(app, "/items", b"lang=en_US"))
+        await asyncio.sleep(0.05)
+        fast = await asgi_get(app, "/ready")
+        return fast, await slow
+
+    (fast_status, fast_seconds), (slow_status, slow_seconds) = asyncio.run(run())
+    assert (fast_status, slow_status) == (200, 200)
+    assert slow_seconds >= fake_cdn.delay
+    assert fast_seconds < fake_cdn.delay / 2
+    assert sum(fake_cdn.hits.values()) == 3
+
+
+def test_async_mode_fetches_datasets_on_the_loop_client(make_viewer, fake_cdn, monkeypatch):
+    import requests
+
+    from conftest import patch_data
+
+    def blocking_get(*args, **kwargs):
+        raise AssertionError("requests used in async mode")
+
+    monkeypatch.setattr(requests, "get", blocking_get)
+    champions, _ = patch_data("en_US")
+    fake_cdn.delay = 0
+    fake_cdn.files["/api/versions.json"] = ["14.2.1"]
+    fake_cdn.files["/cdn/14.2.1/data/en_US/championFull.json"] = {"data": champions}
+    viewer = make_viewer(ddragon_url=fake_cdn.url, async_fetch=True)
+
+    assert viewer.get_latest_version() == "14.2.1"
+    assert set(viewer.load_data("14.2.1", "en_US", "championFull")) == set(champions)
+    assert fake_cdn.hits["/cdn/14.2.1/data/en_US/championFull.json"] == 1
+
+    unreachable = make_viewer(ddragon_url="http://127.0.0.1:9", async_fetch=True)
+    assert unreachable.get_latest_version(fallback="fallback") == "fallback"
@@ -0,0 +1,85 @@
+import io
+import json
+import os
+import tarfile
+
+import pytest
+
+import bundle
+from conftest import champion, icon_bytes, item
+from image_store import ImageStore
+
+
+def add(archive, name, data):
+    info = tarfile.TarInfo(name)
+    info.size = len(data)
+    archive.addfile(info, io.BytesIO(data))
+
+
+def write_dragontail(path, version):
+    with tarfile.open(path, "w:gz") as archive:
+        add(archive, "img/champion/Ahri_splash.png", icon_bytes("blue"))
+        for language in ("en_US", "pl_PL"):
+            champions = {"Ahri": champion("Ahri", "Ahri", "the Nine-Tailed Fox")}
+            items = {"1001": item("1001", "Boots", 300)}
+            add(archive, f"{version}/data/{language}/championFull.json", json.dumps({"data": champions}).encode())
+            add(archive, f"{version}/data/{language}/item.json", json.dumps({"data": items}).encode())
+        for kind, name in (("champion", "Ahri"), ("item", "1001"), ("spell", "AhriQ")):
+            add(archive, f"{version}/img/{kind}/{name}.png", icon_bytes("green"))
+
+
+def test_dragontail_with_top_level_img_first_imports_its_patch(viewer, tmp_path):
+    path = os.path.join(tmp_path, "dragontail.tgz")
+    write_dragontail(path, "14.2.1")
+    assert bundle.import_bundle(viewer, path) == "14.2.1"
+    assert not os.path.exists(os.path.join(viewer.cache_dir, "img"))
+    assert os.path.exists(os.path.join(viewer.cache_dir, "14.2.1", ".complete"))
+    assert viewer.image_store.contains("14.2.1", "Ahri.png")
+
+
+def test_failed_import_of_an_export_is_not_marked_complete(viewer, tmp_path, monkeypatch):
+    path = os.path.join(tmp_path, "export.tgz")
+    with tarfile.open(path, "w:gz") as archive:
+        add(archive, "14.2.1/.complete", b"")
+        add(archive, "14.2.1/en_US/item.json", b"{}")
+
+    def crash(*args):
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr(viewer, "build_offline", crash)
+    with pytest.raises(RuntimeError):
+        bundle.import_bundle(viewer, path)
+    assert os.path.exists(os.path.join(viewer.cache_dir, "14.2.1", "en_US", "item.json"))
+    assert not os.path.exists(os.path.join(viewer.cache_dir, "14.2.1", ".complete"))
+
+
+def test_importing_an_export_keeps_local_packs_intact(viewer, tmp_path):
+    old = viewer.latest_version
+    viewer.pack_images(old)
+    local_icons = {name: viewer.image_store.read(old, name) for name in viewer.image_store.index(old)}
+
+    # Another node packed the same old patch with a different set of icons, so its offsets differ.
+    other = ImageStore(os.path.join(tmp_path, "other"))
+    for version, icons in ((old, {"Zed.png": "blue", "Ahri.png": "blue"}), ("14.2.1", {"Ahri.png": "blue", "New.png": "yellow"})):
+        icon_dir = os.path.join(tmp_path, "icons", version)
+        os.makedirs(icon_dir)
+        os.makedirs(os.path.join(other.cache_dir, version))
+        for name, color in icons.items():
+            with open(os.path.join(icon_dir, name), "wb") as file:
+                file.write(icon_bytes(color))
+        other.build(version, [icon_dir], viewer.version_key)
+
+    path = os.path.join(tmp_path, "export.tgz")
+    with tarfile.open(path, "w:gz") as archive:
+        for name in ("championFull.json", "item.json"):
+            with open(os.path.join(viewer.cache_dir, old, "en_US", name), "rb") as file:
+                add(archive, f"14.2.1/en_US/{name}", file.read())
+        for version, name in (("14.2.1", "images.index.json"), ("14.2.1", "images.pack"), (old, "images.pack")):
+            with open(os.path.join(other.cache_dir, version, name), "rb") as file:
+                add(archive, f"{version}/{name}", file.read())
+
+    assert bundle.import_bundle(viewer, path, languages=("en_US",)) == "14.2.1"
+    assert {name: viewer.image_store.read(old, name) for name in local_icons} == local_icons
+    assert viewer.image_store.read("14.2.1", "Ahri.png") == icon_bytes("blue")
+    assert viewer.image_store.read("14.2.1", "New.png") == icon_bytes("yellow")
+    assert not os.path.exists(os.path.join(viewer.cache_dir, "14.2.1", "_import"))
@@ -0,0 +1,36 @@
+import base64
+import json
+
+import pytest
+
+from catalog import Catalog, CatalogError
+
+RECORDS = [{"id": str(n), "name": f"Item {n:02d}", "tags": ["Damage"]} for n in range(10)]
+
+
+def cursor(version, sort, offset):
+    return base64.urlsafe_b64encode(f"{version}|{sort}|{offset}".encode()).decode().rstrip("=")
+
+
+def test_cursors_page_through_every_record_once():
+    catalog = Catalog("14.1.1", RECORDS, ("name",))
+    seen, next_cursor = [], None
+    while True:
+        page = json.loads(catalog.page(limit=3, cursor=next_cursor))
+        seen += [record["id"] for record in page["data"]]
+        next_cursor = page["next"]
+        if next_cursor is None:
+            break
+    assert seen == [record["id"] for record in RECORDS]
+
+
+@pytest.mark.parametrize("offset", [-3, -1, 11, 1000])
+def test_out_of_range_cursor_offsets_are_rejected(offset):
+    catalog = Catalog("14.1.1", RECORDS, ("name",))
+    with pytest.raises(CatalogError):
+        catalog.page(cursor=cursor("14.1.1", "name", offset))
+
+
+def test_api_answers_bad_cursors_with_400(viewer):
+    response = viewer.app.test_client().get("/api/champions", query_string={"cursor": cursor(viewer.latest_version, "name", -3)})
+    assert response.status_code == 400
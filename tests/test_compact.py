@@ -0,0 +1,15 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from compact import load_compact, save_compact
+
+
+def test_concurrent_writers_do_not_clobber_each_other(tmp_path):
+    path = os.path.join(tmp_path, "item.compact")
+    datasets = [{str(n): {"name": f"item {n}"} for n in range(writer, writer + 200)} for writer in range(8)]
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda data: [save_compact(path, data) for _ in range(20)], datasets))
+
+    assert load_compact(path) in datasets
+    assert os.listdir(tmp_path) == ["item.compact"]
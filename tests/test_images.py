@@ -0,0 +1,50 @@
+import os
+
+import pytest
+
+from image_pipeline import ImagePipeline
+
+
+def test_unknown_versions_are_rejected_and_not_remembered(viewer):
+    client = viewer.app.test_client()
+    assert client.get(f"/images/{viewer.latest_version}/pl_PL/Ahri.png").status_code == 200
+    indexes = dict(viewer.image_store._indexes)
+
+    for version in ("1a", "1b", "99.1.1", "14.1.1x"):
+        assert client.get(f"/images/{version}/pl_PL/Ahri.png").status_code == 404
+    assert viewer.image_store._indexes == indexes
+    assert viewer.image_store.index("1c") == {}
+    assert "1c" not in viewer.image_store._indexes
+
+
+def test_packed_icons_are_served_from_the_index(viewer):
+    viewer.pack_images(viewer.latest_version)
+    response = viewer.app.test_client().get(f"/images/{viewer.latest_version}/en_US/Annie.png")
+    assert response.status_code == 200
+    assert response.cache_control.immutable
+    assert viewer.latest_version in viewer.image_store._indexes
+
+
+def test_png_only_detail_pages_link_icons_that_are_served(make_viewer):
+    viewer = make_viewer(image_formats=("png",))
+    client = viewer.app.test_client()
+    page = client.get("/champion/Ahri", query_string={"lang": "en_US"}).get_data(as_text=True)
+    assert f"/images/{viewer.latest_version}/en_US/Ahri@64.png" in page
+    with open(os.path.join("cache", viewer.latest_version, "en_US", "Ahri.png"), "rb") as file:
+        icon = file.read()
+    # Only Ahri.png is on disk, so the variant and an unconfigured webp both fall back to it.
+    for name in ("Ahri@64.png", "Ahri@64.webp", "Ahri@512.png"):
+        response = client.get(f"/images/{viewer.latest_version}/en_US/{name}")
+        assert response.get_data() == icon, name
+
+
+def test_pipelines_without_png_are_rejected():
+    with pytest.raises(ValueError):
+        ImagePipeline(formats=("webp",))
+
+
+def test_variants_use_configured_sizes_and_formats():
+    assert ImagePipeline(sizes=(32, 64), formats=("png", "webp")).best_variant("Ahri.png", 64) == "Ahri@64.webp"
+    assert ImagePipeline(sizes=(32, 64), formats=("png",)).best_variant("Ahri.png", 128) == "Ahri@64.png"
+    assert ImagePipeline(sizes=(32, 128), formats=("png",)).best_variant("Ahri.png", 64) == "Ahri@128.png"
+    assert ImagePipeline(sizes=(32,), formats=("png",)).best_variant("Ahri.png", 64) == "Ahri.png"
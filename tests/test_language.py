@@ -0,0 +1,42 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from conftest import CHAMPIONS, ITEMS
+
+# Text only the page in that language may contain, per URL; every page has the language picker.
+EXPECTED = {
+    "/": lambda language, translations: [translations["welcome"], translations["english"]],
+    "/champions": lambda language, translations: [translations["english"]],
+    "/items": lambda language, translations: [ITEMS[language]["3071"]],
+    "/champion/Ahri": lambda language, translations: [translations["skills"], CHAMPIONS[language]["Ahri"][1]],
+    "/item/3071": lambda language, translations: [ITEMS[language]["3071"], translations["cost"]],
+    "/quiz/items": lambda language, translations: [translations["completed"]],
+}
+
+
+def test_parallel_mixed_language_requests_get_their_own_language(viewer):
+    client = viewer.app.test_client()
+    other = {"en_US": "pl_PL", "pl_PL": "en_US"}
+    cookie_clients = {}
+    for language in other:
+        cookie_clients[language] = viewer.app.test_client()
+        cookie_clients[language].set_cookie("language", language)
+
+    def fetch(case):
+        url, language, by_cookie = case
+        if by_cookie:
+            response = cookie_clients[language].get(url)
+        else:
+            response = client.get(url, query_string={"lang": language})
+        return case, response.status_code, response.get_data(as_text=True)
+
+    cases = [(url, language, by_cookie) for _ in range(10) for url in EXPECTED for language in other for by_cookie in (False, True)]
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        results = list(executor.map(fetch, cases))
+
+    for (url, language, by_cookie), status, body in results:
+        assert status == 200, url
+        assert f'<html lang="{language}">' in body, (url, language, by_cookie)
+        for text in EXPECTED[url](language, viewer.translations[language]):
+            assert text in body, (url, language, by_cookie, text)
+        for text in EXPECTED[url](other[language], viewer.translations[other[language]]):
+            assert text not in body, (url, language, by_cookie, text)
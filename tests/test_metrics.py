@@ -0,0 +1,64 @@
+import os
+import re
+
+
+def scrape(client):
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.content_type == "text/plain; version=0.0.4; charset=utf-8"
+    samples = {}
+    for line in response.get_data(as_text=True).splitlines():
+        if line and not line.startswith("#"):
+            series, value = line.rsplit(" ", 1)
+            samples[series] = float(value)
+    return samples
+
+
+def test_metrics_count_requests_per_endpoint_with_the_worker_pid(viewer):
+    client = viewer.app.test_client()
+    pid = f'pid="{os.getpid()}"'
+    # The registry is per process and other tests share it, so compare two scrapes.
+    before = scrape(client)
+    for _ in range(3):
+        assert client.get("/champions").status_code == 200
+    assert client.get("/champion/Nope").status_code == 404
+    for _ in range(3):
+        assert client.get("/champion/Ahri").status_code == 200
+    after = scrape(client)
+
+    def delta(series):
+        return after[series] - before.get(series, 0)
+
+    assert delta(f'league_requests_total{{endpoint="champions",status="200",{pid}}}') == 3
+    assert delta(f'league_requests_total{{endpoint="champion_details",status="404",{pid}}}') == 1
+    assert delta(f'league_request_duration_seconds_count{{endpoint="champions",method="GET",{pid}}}') == 3
+    assert delta(f'league_request_duration_seconds_bucket{{endpoint="champions",method="GET",le="+Inf",{pid}}}') == 3
+    # The first /champion/Ahri renders the page, the next two come from the page cache.
+    assert delta(f'league_cache_hits_total{{cache="page",{pid}}}') == 2
+    assert f'league_page_cache_bytes{{{pid}}}' in after
+    assert all(re.fullmatch(r"\w+\{.*" + re.escape(pid) + r"\}", series) for series in after)
+
+
+def test_fetch_cache_processing_and_render_metrics_are_per_endpoint(make_viewer, fake_cdn):
+    fake_cdn.delay = 0
+    os.remove(os.path.join("cache", "14.1.1", "en_US", "1001.png"))
+    os.remove(os.path.join("cache", "14.1.1", "pl_PL", "1001.png"))
+    viewer = make_viewer(ddragon_url=fake_cdn.url)
+    client = viewer.app.test_client()
+    pid = f'pid="{os.getpid()}"'
+    before = scrape(client)
+    assert client.get("/quiz/items/batch", query_string={"n": 50, "lang": "en_US"}).status_code == 200
+    assert client.get("/champion/Ahri", query_string={"lang": "en_US"}).status_code == 200
+    viewer.prefetch_images(viewer.latest_version, "pl_PL", [(viewer.image_url("item", "1001"), "1001.png")])
+    after = scrape(client)
+
+    def delta(series):
+        return after.get(series, 0) - before.get(series, 0)
+
+    assert delta(f'league_ddragon_fetches_total{{endpoint="quiz_batch",kind="image",result="2xx",{pid}}}') == 1
+    assert delta(f'league_ddragon_fetches_total{{endpoint="background",kind="image",result="2xx",{pid}}}') == 1
+    assert delta(f'league_image_process_duration_seconds_count{{endpoint="quiz_batch",{pid}}}') == 1
+    assert delta(f'league_image_cache_lookups_total{{endpoint="quiz_batch",result="hit",{pid}}}') >= 2
+    assert delta(f'league_image_cache_lookups_total{{endpoint="quiz_batch",result="miss",{pid}}}') == 1
+    assert delta(f'league_image_cache_lookups_total{{endpoint="champion_details",result="hit",{pid}}}') == 1
+    assert delta(f'league_template_render_seconds_count{{endpoint="champion_details",template="champion_details.html",{pid}}}') == 1
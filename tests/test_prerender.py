@@ -0,0 +1,53 @@
+import json
+import os
+import time
+
+from conftest import VERSION, item
+
+EXTRA_ITEMS = [str(item_id) for item_id in range(2001, 2006)]
+
+
+def add_items_without_icons(cache_dir):
+    """Items off map 11 (e.g. ARAM only) that no sprite covers, with no icon on disk."""
+    for language in ("en_US", "pl_PL"):
+        path = os.path.join(cache_dir, VERSION, language, "item.json")
+        with open(path) as file:
+            items = json.load(file)
+        for item_id in EXTRA_ITEMS:
+            items[item_id] = dict(item(item_id, f"Item {item_id}", 500), maps={"11": False, "12": True})
+        with open(path, "w") as file:
+            json.dump(items, file)
+
+
+def test_prerender_fetches_every_page_icon_in_one_batch_and_packs_it(make_viewer, fake_cdn):
+    add_items_without_icons("cache")
+    fake_cdn.delay = 0.2
+    viewer = make_viewer(ddragon_url=fake_cdn.url)
+
+    started = time.perf_counter()
+    viewer.prewarm(prerender=True)
+    elapsed = time.perf_counter() - started
+
+    # 10 one-by-one downloads would take 2s; one batch per language takes about 0.4s.
+    assert elapsed < 1.5
+    assert sum(fake_cdn.hits.values()) == len(EXTRA_ITEMS) * 2
+    for item_id in EXTRA_ITEMS:
+        assert viewer.image_store.contains(viewer.latest_version, f"{item_id}.png")
+
+
+def test_rendering_a_page_does_not_wait_for_its_icon(make_viewer, fake_cdn):
+    add_items_without_icons("cache")
+    fake_cdn.delay = 1
+    viewer = make_viewer(ddragon_url=fake_cdn.url)
+    client = viewer.app.test_client()
+
+    started = time.perf_counter()
+    response = client.get("/item/2001", query_string={"lang": "en_US"})
+    assert response.status_code == 200
+    assert time.perf_counter() - started < 0.5
+
+    image_path = os.path.join("cache", VERSION, "en_US", "2001.png")
+    deadline = time.monotonic() + 5
+    while not os.path.isfile(image_path) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert os.path.isfile(image_path)
@@ -0,0 +1,48 @@
+import pytest
+
+from conftest import write_patch
+
+
+@pytest.mark.parametrize("kind", ["items", "champions"])
+def test_batches_deal_the_whole_deck_once(viewer, kind):
+    client = viewer.app.test_client()
+    first = client.get(f"/quiz/{kind}/batch", query_string={"n": 2, "lang": "en_US"}).get_json()
+    session, total = first["session"], first["total"]
+    answers = [question["correct_answer"] for question in first["questions"]]
+    offset = first["offset"]
+    while offset < total:
+        batch = client.get(f"/quiz/{kind}/batch", query_string={"session": session, "n": 2, "offset": offset, "lang": "en_US"}).get_json()
+        assert [question["position"] for question in batch["questions"]] == list(range(offset, batch["offset"]))
+        answers += [question["correct_answer"] for question in batch["questions"]]
+        offset = batch["offset"]
+    assert len(answers) == total
+    if kind == "items":
+        assert len(set(answers)) == total
+
+
+@pytest.mark.parametrize("path", ["/quiz/items/next", "/quiz/champions/next"])
+def test_random_question_routes_are_gone(viewer, path):
+    assert viewer.app.test_client().get(path).status_code == 404
+
+
+@pytest.mark.parametrize("kind", ["items", "champions"])
+def test_a_patch_swap_while_starting_a_quiz_starts_it_on_the_new_patch(viewer, kind):
+    write_patch(viewer.cache_dir, "14.2.1")
+    start = viewer.quiz.start
+
+    def start_then_swap(version, language):
+        session_id = start(version, language)
+        if viewer.latest_version != "14.2.1":
+            viewer.swap_version("14.2.1")
+        return session_id
+
+    viewer.quiz.start = start_then_swap
+    response = viewer.app.test_client().get(f"/quiz/{kind}", query_string={"lang": "en_US"})
+    assert response.status_code == 200
+    assert "14.2.1-en_US-" in response.get_data(as_text=True)
+
+
+@pytest.mark.parametrize("kind", ["items", "champions"])
+def test_an_empty_deck_is_a_503(viewer, monkeypatch, kind):
+    monkeypatch.setattr(viewer, "quiz_size", lambda kind, version, language: 0)
+    assert viewer.app.test_client().get(f"/quiz/{kind}").status_code == 503
@@ -0,0 +1,19 @@
+import pytest
+
+from search_index import SearchIndex
+
+NAMES = ["Kai'Sa", "Cho'Gath", "Kha'Zix", "Vel'Koz", "Rek'Sai", "Bel'Veth", "Dr. Mundo", "Ahri", "Łucznik"]
+
+
+@pytest.fixture
+def index():
+    return SearchIndex([(name, name, [("name", name)]) for name in NAMES])
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("kaisa", "Kai'Sa"), ("Kai'Sa", "Kai'Sa"), ("kai", "Kai'Sa"), ("chogath", "Cho'Gath"), ("khazix", "Kha'Zix"),
+    ("velkoz", "Vel'Koz"), ("reksai", "Rek'Sai"), ("belveth", "Bel'Veth"), ("dr mundo", "Dr. Mundo"),
+    ("mundo", "Dr. Mundo"), ("Dr. Mundo", "Dr. Mundo"), ("lucznik", "Łucznik"), ("ahr", "Ahri"),
+])
+def test_punctuated_names_are_found_by_their_natural_spelling(index, query, expected):
+    assert [entry_id for entry_id, _ in index.search(query, 3)][:1] == [expected]
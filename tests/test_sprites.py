@@ -0,0 +1,26 @@
+import os
+
+from sprites import load_sprite
+
+
+def test_sprite_is_rebuilt_once_a_missing_icon_arrives(viewer):
+    client = viewer.app.test_client()
+    language_dir = viewer.language_dir("pl_PL")
+    icon_path = os.path.join(language_dir, "Annie.png")
+    with open(icon_path, "rb") as file:
+        icon = file.read()
+    os.remove(icon_path)
+
+    assert client.get("/champions?lang=pl_PL").status_code == 200
+    sprite_path = os.path.join(language_dir, "sprites", "champions.png")
+    assert load_sprite(sprite_path)[1] == ["Annie.png"]
+
+    response = client.get(f"/images/{viewer.latest_version}/pl_PL/sprites/champions.png")
+    assert response.status_code == 200
+    assert not response.cache_control.immutable
+    assert response.cache_control.max_age == 300
+
+    with open(icon_path, "wb") as file:
+        file.write(icon)
+    assert client.get("/champions?lang=pl_PL").status_code == 200
+    assert load_sprite(sprite_path)[1] == []
@@ -0,0 +1,70 @@
+import os
+import time
+
+from conftest import CHAMPIONS, patch_data, write_patch
+
+
+def test_one_process_leads_and_the_others_follow_complete_patches(viewer):
+    import app as app_module
+
+    other = app_module.LeagueViewer(ddragon_url="http://127.0.0.1:9", offline=True)
+    assert viewer.poller.is_leader()
+    assert not other.poller.is_leader()
+
+    write_patch(os.path.join(viewer.cache_dir), "14.2.1", complete=False)
+    assert other.poller.follow() is None
+
+    open(os.path.join(viewer.cache_dir, "14.2.1", ".complete"), "w").close()
+    assert other.poller.follow() == "14.2.1"
+    assert other.latest_version == "14.2.1"
+    assert other.poller.follow() is None
+
+
+def test_leader_does_not_warm_a_patch_already_on_disk(viewer, monkeypatch):
+    write_patch(viewer.cache_dir, "14.2.1")
+    monkeypatch.setattr(viewer, "get_latest_version", lambda fallback=None: "14.2.1")
+    monkeypatch.setattr(viewer, "warm_version", lambda version: (_ for _ in ()).throw(AssertionError("warmed twice")))
+    assert viewer.poller.check() == "14.2.1"
+    assert viewer.latest_version == "14.2.1"
+
+
+def serve_patch(fake_cdn, version, versions):
+    fake_cdn.delay = 0
+    fake_cdn.files["/api/versions.json"] = versions
+    for language in CHAMPIONS:
+        champions, items = patch_data(language)
+        fake_cdn.files[f"/cdn/{version}/data/{language}/championFull.json"] = {"data": champions}
+        fake_cdn.files[f"/cdn/{version}/data/{language}/item.json"] = {"data": items}
+
+
+def test_poller_warms_and_swaps_to_a_new_patch_from_the_cdn(make_viewer, fake_cdn):
+    serve_patch(fake_cdn, "14.2.1", ["14.2.1", "14.1.1"])
+    viewer = make_viewer(ddragon_url=fake_cdn.url)
+    viewer.poller.follow_interval = 0.05
+    viewer.poller.start()
+    try:
+        deadline = time.monotonic() + 10
+        while viewer.latest_version != "14.2.1" and time.monotonic() < deadline:
+            time.sleep(0.05)
+    finally:
+        viewer.poller.stop(timeout=5)
+
+    assert viewer.latest_version == "14.2.1"
+    assert os.path.exists(os.path.join(viewer.cache_dir, "14.2.1", ".complete"))
+    assert viewer.image_store.contains("14.2.1", "Ahri.png")
+    assert fake_cdn.hits["/api/versions.json"] >= 1
+    assert fake_cdn.hits["/cdn/14.2.1/data/en_US/championFull.json"] == 1
+    assert fake_cdn.hits["/cdn/14.2.1/img/champion/Ahri.png"] == len(CHAMPIONS)  # once per language
+    response = viewer.app.test_client().get("/champion/Ahri", query_string={"lang": "en_US"})
+    assert "/images/14.2.1/" in response.get_data(as_text=True)
+
+
+def test_poller_never_swaps_back_to_an_older_patch(make_viewer, fake_cdn):
+    # A newer patch imported from a bundle before the CDN publishes it.
+    write_patch("cache", "14.2.1")
+    serve_patch(fake_cdn, "14.1.1", ["14.1.1"])
+    viewer = make_viewer(ddragon_url=fake_cdn.url)
+    assert viewer.latest_version == "14.2.1"
+    assert viewer.poller.check() is None
+    assert viewer.poller.follow() is None
+    assert viewer.latest_version == "14.2.1"
@@ -0,0 +1,59 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from asgiref.wsgi import WsgiToAsgi, WsgiToAsgiInstance
+
+
+class ThreadedWsgiToAsgi(WsgiToAsgi):
+    """WsgiToAsgi that runs each request on a thread pool instead of asgiref's single shared thread.
+
+    asgiref runs the WSGI app with sync_to_async(thread_sensitive=True), which puts every
+    request on one thread: a handler waiting on the CDN stalled the whole server. Here
+    handlers run side by side on up to `max_workers` threads; Flask keeps its request state
+    per thread, so nothing else changes.
+    """
+
+    def __init__(self, wsgi_application, max_workers=32):
+        super().__init__(wsgi_application)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="asgi-request")
+
+    async def __call__(self, scope, receive, send):
+        await ThreadedWsgiToAsgiInstance(self.wsgi_application, self.executor)(scope, receive, send)
+
+
+class ThreadedWsgiToAsgiInstance(WsgiToAsgiInstance):
+    def __init__(self, wsgi_application, executor):
+        super().__init__(wsgi_application)
+        self.executor = executor
+
+    async def run_wsgi_app(self, body):
+        await sync_to_async(self.run_wsgi_app_sync, thread_sensitive=False, executor=self.executor)(body)
+
+    def run_wsgi_app_sync(self, body):
+        """Run the WSGI app on a pool thread and stream its response through sync_send.
+
+        Mirrors asgiref's own run_wsgi_app, which is only reachable wrapped in its
+        thread_sensitive decorator, and also closes the response iterable as WSGI requires.
+        """
+        environ = self.build_environ(self.scope, body)
+        bytes_sent = 0
+        output = self.wsgi_application(environ, self.start_response)
+        try:
+            for chunk in output:
+                if not self.response_started:
+                    self.response_started = True
+                    self.sync_send(self.response_start)
+                # Never send more than the Content-Length the app announced.
+                if self.response_content_length is not None:
+                    chunk = chunk[:self.response_content_length - bytes_sent]
+                self.sync_send({"type": "http.response.body", "body": chunk, "more_body": True})
+                bytes_sent += len(chunk)
+                if bytes_sent == self.response_content_length:
+                    break
+        finally:
+            if hasattr(output, "close"):
+                output.close()
+        if not self.response_started:
+            self.response_started = True
+            self.sync_send(self.response_start)
+        self.sync_send({"type": "http.response.body"})
@@ -0,0 +1,95 @@
+import os
+import threading
+import time
+
+from logs import get_logger
+
+try:
+    import fcntl
+except ImportError:  # Windows runs waitress, a single process, so there is nobody to share the cache with.
+    fcntl = None
+
+log = get_logger("version_poller")
+
+
+class VersionPoller:
+    """Checks versions.json in the background and hot swaps the viewer to a new patch once it is fully cached.
+
+    Only the process holding cache/.poller.lock (one gunicorn worker) downloads and packs a new
+    patch. Every process, that one included, looks for a newer .complete patch on disk every
+    `follow_interval` seconds and swaps to it, so the workers change patch within a few seconds
+    of each other and never pack the same patch twice.
+    """
+
+    def __init__(self, viewer, interval=3600, follow_interval=5):
+        self.viewer = viewer
+        self.interval = interval
+        self.follow_interval = follow_interval
+        self.thread = None
+        self.stop_event = threading.Event()
+        self.lock_file = None
+
+    def start(self):
+        if self.thread and self.thread.is_alive():
+            return
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.run, name="version-poller", daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout=None):
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join(timeout)
+
+    def run(self):
+        next_check = 0
+        while not self.stop_event.is_set():
+            try:
+                if time.monotonic() >= next_check and self.is_leader():
+                    next_check = time.monotonic() + self.interval
+                    self.check()
+                self.follow()
+            except Exception as e:
+                log.error("Version poll failed: %s", e)
+            self.stop_event.wait(self.follow_interval)
+
+    def is_leader(self):
+        """Whether this process downloads new patches; the lock is kept until the process exits."""
+        if fcntl is None or self.lock_file is not None:
+            return True
+        os.makedirs(self.viewer.cache_dir, exist_ok=True)
+        lock_file = open(os.path.join(self.viewer.cache_dir, ".poller.lock"), "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self.lock_file = lock_file
+        return True
+
+    def check(self):
+        """Warm and swap to the newest patch; returns the new version or None when nothing changed.
+
+        Only moves forward, so a newer patch imported from a bundle is not swapped out for the
+        CDN's older one (and back again by follow()).
+        """
+        version = self.viewer.get_latest_version(fallback=None)
+        if not version or self.viewer.version_key(version) <= self.viewer.version_key(self.viewer.latest_version):
+            return None
+        if version not in self.viewer.ddragon.cached_versions():
+            self.viewer.warm_version(version)
+        self.viewer.swap_version(version)
+        return version
+
+    def follow(self):
+        """Swap to a newer patch another process finished caching; returns it or None."""
+        versions = self.viewer.ddragon.cached_versions()
+        if not versions or self.viewer.version_key(versions[-1]) <= self.viewer.version_key(self.viewer.latest_version):
+            return None
+        version = versions[-1]
+        # The leader left compact datasets behind; loading them here keeps the first requests after the swap fast.
+        for language in self.viewer.translations:
+            self.viewer.get_data("championFull", language, version)
+            self.viewer.get_data("item", language, version)
+        self.viewer.swap_version(version)
+        return version
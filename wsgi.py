@@ -0,0 +1,28 @@
+import gc
+
+import logs
+from app import LeagueViewer
+
+
+def create_app(start_poller=True, prerender=True, async_fetch=False):
+    """Application factory for gunicorn/waitress.
+
+    Datasets, indexes, icons, sprites and (optionally) every rendered detail page are loaded
+    before the app is returned, so with gunicorn's preload_app the forked workers share them
+    copy-on-write.
+    """
+    logs.configure()
+    viewer = LeagueViewer(async_fetch=async_fetch)
+    viewer.prewarm(prerender=prerender)
+    # Move the warmed objects out of the collector's generations so a gc pass in a worker
+    # does not touch (and copy) every page inherited from the parent.
+    gc.freeze()
+    if start_poller:
+        viewer.poller.start()
+    return viewer.app
+
+
+if __name__ == "__main__":
+    from waitress import serve
+
+    serve(create_app(), host="0.0.0.0", port=10000, threads=8)